@@ -0,0 +1,81 @@
+"""Misst die Verzögerung des asyncio-Loops bei vielen Log-Einträgen.
+
+Simuliert eine langsame Platte (jeder Schreibvorgang dauert WRITE_DELAY) und
+vergleicht direktes Logging mit der Queue-Pipeline aus logging_setup.py.
+
+Aufruf: python benchmarks/bench_logging.py
+"""
+import asyncio
+import io
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logging_setup import LoggingPipeline, TEXT_FORMAT, JobIdFilter
+
+WRITE_DELAY = 0.0005  # 0,5 ms pro Eintrag
+ENTRIES = 2000
+TICK = 0.005
+
+
+class SlowStream(io.StringIO):
+    def write(self, text):
+        time.sleep(WRITE_DELAY)
+        return super().write(text)
+
+
+async def measure_lag():
+    """Loggt ENTRIES Einträge in Schüben und misst dabei die Loop-Verzögerung"""
+    lags = []
+    done = False
+
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    task = asyncio.create_task(ticker())
+    log = logging.getLogger('bench')
+    for i in range(ENTRIES // 50):
+        for j in range(50):
+            log.info("Sende Wake-on-LAN Paket an pc%d (Versuch %d)", i, j)
+            log.debug("Details zu pc%d: %s", i, {'mac': '00:11:22:33:44:55'})
+        await asyncio.sleep(0)
+    done = True
+    await task
+    return lags
+
+
+def report(label, lags):
+    lags = sorted(lags)
+    p99 = lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[-1]
+    print(f"{label:<16} Median {statistics.median(lags) * 1000:7.2f} ms   "
+          f"p99 {p99 * 1000:7.2f} ms   Max {lags[-1] * 1000:7.2f} ms")
+
+
+def main():
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+
+    # Direkt schreibender Handler wie bisher mit basicConfig
+    handler = logging.StreamHandler(SlowStream())
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handler.addFilter(JobIdFilter())
+    root.addHandler(handler)
+    report("Synchron", asyncio.run(measure_lag()))
+    root.removeHandler(handler)
+
+    pipeline = LoggingPipeline(stream=SlowStream(), queue_size=ENTRIES * 2)
+    pipeline.start()
+    lags = asyncio.run(measure_lag())
+    pipeline.stop()
+    report("Queue-Pipeline", lags)
+
+
+if __name__ == '__main__':
+    main()
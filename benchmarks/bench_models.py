@@ -0,0 +1,75 @@
+"""Vergleicht Speicherbedarf und MAC-Lookup von Dictionaries und Computer-Objekten.
+
+Aufruf: python benchmarks/bench_models.py [Anzahl Computer]
+"""
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Computer, parse_mac
+
+
+def make_entries(count):
+    return {
+        f"pc{i}": {
+            "mac": ":".join(f"{(i >> shift) & 0xff:02x}" for shift in (40, 32, 24, 16, 8, 0)),
+            "ip": f"10.{(i >> 16) & 0xff}.{(i >> 8) & 0xff}.{i & 0xff}"
+        }
+        for i in range(count)
+    }
+
+
+def measure(build):
+    """Liefert (Ergebnis, belegte Bytes) für build()"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(label, func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    per_call = (time.perf_counter() - start) / repeat
+    print(f"  {label:<36} {per_call * 1e6:>12.2f} µs")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    raw = make_entries(count)
+    macs = [data["mac"].upper() for data in raw.values()]
+
+    # Beide Varianten werden wie beim Start aus dem JSON-Text aufgebaut
+    text = json.dumps(raw)
+    del raw
+    dicts, dict_size = measure(lambda: json.loads(text))
+    inventory, model_size = measure(lambda: {name: Computer.from_dict(name, data) for name, data in json.loads(text).items()})
+
+    print(f"Speicher ({count} Computer)")
+    print(f"  {'Dictionaries':<36} {dict_size / 1024 / 1024:>10.2f} MiB")
+    print(f"  {'Computer (__slots__)':<36} {model_size / 1024 / 1024:>10.2f} MiB")
+
+    by_mac = {computer.mac: name for name, computer in inventory.items()}
+
+    def linear_lookup():
+        mac = random.choice(macs).lower()
+        next(name for name, data in dicts.items() if data["mac"].lower() == mac)
+
+    print(f"Lookup nach MAC ({count} Computer)")
+    timed("Linear über Strings (bisher)", linear_lookup, 20)
+    timed("Dictionary über 48-Bit-Zahl", lambda: by_mac[parse_mac(random.choice(macs))], 20000)
+    timed("Index aufbauen", lambda: {c.mac: n for n, c in inventory.items()}, 20)
+    timed("Validieren beim Laden", lambda: [Computer.from_dict(n, d) for n, d in dicts.items()], 3)
+
+
+if __name__ == '__main__':
+    main()
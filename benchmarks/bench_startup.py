@@ -0,0 +1,41 @@
+"""Misst die Import-Zeit von server.py in einem leeren Arbeitsverzeichnis.
+
+Aufruf: python benchmarks/bench_startup.py [Anzahl Durchläufe]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(runs):
+    durations = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, '-c', 'import server'],
+                cwd=work_dir,
+                env={**os.environ, 'PYTHONPATH': REPO_DIR},
+                check=True
+            )
+            durations.append(time.perf_counter() - start)
+        created = sorted(os.listdir(work_dir))
+    return durations, created
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    durations, created = measure(runs)
+    print(f"Durchläufe: {runs}")
+    print(f"Median: {statistics.median(durations) * 1000:.1f} ms")
+    print(f"Minimum: {min(durations) * 1000:.1f} ms")
+    print(f"Beim Import angelegte Dateien: {created or 'keine'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Vergleicht Lese- und Schreibkosten von JSON- und SQLite-Speicher.
+
+Aufruf: python benchmarks/bench_storage.py [Anzahl Computer]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import load_computers, save_computers
+from sqlite_store import open_store, close_stores
+
+
+def make_computers(count):
+    return {
+        f"pc{i}": {
+            "mac": ":".join(f"{(i >> shift) & 0xff:02x}" for shift in (40, 32, 24, 16, 8, 0)),
+            "ip": f"10.{(i >> 16) & 0xff}.{(i >> 8) & 0xff}.{i & 0xff}"
+        }
+        for i in range(count)
+    }
+
+
+def timed(label, func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    per_call = (time.perf_counter() - start) / repeat
+    print(f"  {label:<28} {per_call * 1e6:>12.1f} µs")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    computers = make_computers(count)
+    names = list(computers)
+    macs = [data["mac"] for data in computers.values()]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        json_file = os.path.join(work_dir, "computers.json")
+        save_computers(computers, json_file)
+
+        def json_update():
+            data = load_computers(json_file)
+            data[random.choice(names)]["ip"] = "10.255.255.1"
+            save_computers(data, json_file)
+
+        def json_mac_lookup():
+            mac = random.choice(macs)
+            next(name for name, data in load_computers(json_file).items() if data["mac"].lower() == mac)
+
+        print(f"JSON ({count} Computer)")
+        timed("Lookup nach Name", lambda: load_computers(json_file)[random.choice(names)], 20)
+        timed("Lookup nach MAC", json_mac_lookup, 20)
+        timed("Update eines Eintrags", json_update, 20)
+
+        store = open_store(os.path.join(work_dir, "computers.db"))
+        store.save_all(computers)
+
+        print(f"SQLite ({count} Computer)")
+        timed("Lookup nach Name", lambda: store.get(random.choice(names)), 2000)
+        timed("Lookup nach MAC", lambda: store.find_by_mac(random.choice(macs)), 2000)
+        timed("Update eines Eintrags", lambda: store.upsert(random.choice(names), {"mac": "00:00:00:00:00:01", "ip": "10.255.255.1"}), 2000)
+        timed("Alle laden", store.load_all, 20)
+        close_stores()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Nebenläufige Verarbeitung von Telegram-Updates
+
+UserUpdateProcessor verarbeitet bis zu max_concurrent_updates Updates
+gleichzeitig, sodass ein langsamer Befehl (z.B. /scan) die Befehle anderer
+Benutzer nicht mehr aufhält. Pro Benutzer sind höchstens per_user Updates
+gleichzeitig in Arbeit; weitere werden sofort abgewiesen statt zu warten.
+Abgewiesene Updates belegen einen globalen Platz nur für die Dauer der
+Prüfung, und der Benutzer bekommt höchstens einen Hinweis, bis eines
+seiner laufenden Updates fertig ist. Ein Benutzer, der viele Befehle auf
+einmal schickt, erzeugt so weder eine Flut von Antworten noch blockiert er
+die übrigen Benutzer.
+"""
+import inspect
+import logging
+
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+def update_user_id(update):
+    """Benutzer-ID eines Updates oder None (z.B. bei Kanal-Posts)"""
+    user = getattr(update, 'effective_user', None)
+    return user.id if user is not None else None
+
+
+class UserUpdateProcessor(BaseUpdateProcessor):
+    """Begrenzt gleichzeitig verarbeitete Updates global und pro Benutzer
+
+    on_reject(update) wird für das erste abgewiesene Update eines Benutzers
+    aufgerufen, z.B. um ihm eine kurze Antwort zu schicken; weitere erst,
+    nachdem eines seiner laufenden Updates fertig ist.
+    """
+
+    __slots__ = ('per_user', 'rejected', '_in_flight', '_notified', '_on_reject')
+
+    def __init__(self, max_concurrent_updates, per_user, on_reject=None):
+        super().__init__(max_concurrent_updates)
+        if per_user < 1:
+            raise ValueError("per_user muss mindestens 1 sein")
+        self.per_user = per_user
+        self.rejected = 0
+        self._in_flight = {}
+        self._notified = set()
+        self._on_reject = on_reject
+
+    async def do_process_update(self, update, coroutine):
+        user_id = update_user_id(update)
+        if user_id is None:
+            await coroutine
+            return
+
+        in_flight = self._in_flight.get(user_id, 0)
+        if in_flight >= self.per_user:
+            self.rejected += 1
+            logger.warning("Benutzer %s hat bereits %d Anfragen in Arbeit, Update wird abgewiesen", user_id, in_flight)
+            if inspect.iscoroutine(coroutine):
+                coroutine.close()
+            if self._on_reject is not None and user_id not in self._notified:
+                self._notified.add(user_id)
+                await self._on_reject(update)
+            return
+
+        self._in_flight[user_id] = in_flight + 1
+        try:
+            await coroutine
+        finally:
+            self._notified.discard(user_id)
+            remaining = self._in_flight[user_id] - 1
+            if remaining:
+                self._in_flight[user_id] = remaining
+            else:
+                del self._in_flight[user_id]
+
+    def in_flight(self, user_id):
+        """Anzahl der Updates eines Benutzers, die gerade verarbeitet werden"""
+        return self._in_flight.get(user_id, 0)
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
@@ -0,0 +1,170 @@
+"""Verlauf der Weckvorgänge
+
+Jeder abgeschlossene Weckvorgang wird als kompakte JSON-Zeile an eine
+Logdatei angehängt. Überschreitet die Datei MAX_BYTES, wird sie wie bei
+logging.handlers.RotatingFileHandler nach .1, .2, ... verschoben.
+
+Die Auswertung liest die Dateien zeilenweise und hält pro Computer nur
+Zähler und ein logarithmisches Histogramm im Speicher, nie das ganze Log.
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Ergebnisse eines Weckvorgangs
+RESULT_ALREADY_ONLINE = 'already_online'
+RESULT_ONLINE = 'online'
+RESULT_TIMEOUT = 'timeout'
+RESULT_ERROR = 'error'
+
+
+class EventLog:
+    """Zeilenweises Ereignis-Log mit größenbasierter Rotation"""
+
+    def __init__(self, path, max_bytes=1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def append(self, event):
+        """Hängt ein Ereignis an und rotiert die Datei bei Bedarf"""
+        line = json.dumps(event, separators=(',', ':'), ensure_ascii=False) + '\n'
+        data = line.encode('utf-8')
+        with self._lock:
+            if self.max_bytes > 0 and self._size() + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, 'ab') as f:
+                f.write(data)
+
+    def files(self):
+        """Alle Logdateien, älteste zuerst"""
+        paths = [f"{self.path}.{i}" for i in range(self.backups, 0, -1)]
+        paths.append(self.path)
+        return [path for path in paths if os.path.exists(path)]
+
+    def __iter__(self):
+        """Liefert alle Ereignisse chronologisch, ohne das Log komplett zu laden"""
+        for path in self.files():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        event = None
+                    # Gültiges JSON, das kein Objekt ist, wäre für compute_stats ebenso unbrauchbar
+                    if not isinstance(event, dict):
+                        logger.warning("Überspringe fehlerhafte Zeile in %s", path)
+                        continue
+                    yield event
+
+    def _size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _rotate(self):
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+def make_event(name, mac, result, seconds, packets, tries):
+    """Erstellt ein Ereignis für einen abgeschlossenen Weckvorgang"""
+    return {
+        'ts': round(time.time(), 3),
+        'name': name,
+        'mac': mac,
+        'result': result,
+        'seconds': round(seconds, 3),
+        'packets': packets,
+        'tries': tries
+    }
+
+
+class Histogram:
+    """Streaming-Histogramm mit logarithmischen Buckets (ca. 5 % Genauigkeit)"""
+
+    GROWTH = 1.05
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+
+    def add(self, value):
+        index = 0 if value <= 1 else math.ceil(math.log(value) / math.log(self.GROWTH))
+        self.counts[index] += 1
+        self.total += 1
+
+    def percentile(self, p):
+        """Obere Grenze des Buckets, in dem das p-Perzentil liegt"""
+        if not self.total:
+            return None
+        rank = math.ceil(self.total * p / 100)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return self.GROWTH ** index
+        return None
+
+
+class HostStats:
+    """Laufende Statistik eines Computers"""
+
+    def __init__(self):
+        self.results = Counter()
+        self.boot_times = Histogram()
+        self.packets = 0
+        self.woken = 0
+
+    def add(self, event):
+        result = event.get('result')
+        self.results[result] += 1
+        if result == RESULT_ONLINE:
+            self.boot_times.add(event.get('seconds', 0))
+            self.packets += event.get('packets', 0)
+            self.woken += 1
+
+    @property
+    def attempts(self):
+        """Weckvorgänge, bei denen der Computer offline war"""
+        return self.results[RESULT_ONLINE] + self.results[RESULT_TIMEOUT] + self.results[RESULT_ERROR]
+
+    @property
+    def failure_rate(self):
+        if not self.attempts:
+            return None
+        return (self.results[RESULT_TIMEOUT] + self.results[RESULT_ERROR]) / self.attempts
+
+    @property
+    def average_packets(self):
+        if not self.woken:
+            return None
+        return self.packets / self.woken
+
+
+def compute_stats(events, name=None):
+    """Fasst Ereignisse pro Computer zusammen, optional nur für einen Namen"""
+    stats = {}
+    for event in events:
+        event_name = event.get('name')
+        if name is not None and event_name != name:
+            continue
+        host = stats.get(event_name)
+        if host is None:
+            host = stats[event_name] = HostStats()
+        host.add(event)
+    return stats
@@ -0,0 +1,150 @@
+"""Last- und Dauertest des Bots gegen den lokalen Bot-API-Stub
+
+Startet den Stub, startet server.py als eigenen Prozess mit
+TELEGRAM_BASE_URL auf den Stub und spielt synthetische Befehle vieler
+Benutzer mit fester Rate ein. Am Ende (und während eines Dauertests
+regelmäßig) werden Latenz-Perzentile, Auslastung des Verbindungspools
+und Speicherverbrauch des Bot-Prozesses ausgegeben.
+
+Beispiele:
+    python loadtest/driver.py --rate 50 --duration 60
+    python loadtest/driver.py --rate 20 --duration 3600 --report-interval 300
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from stub_bot_api import StubServer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(len(values) * p / 100) - 1))]
+
+
+def rss_kib(pid):
+    """Resident Set Size eines Prozesses in KiB (nur Linux)"""
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def make_inventory(count):
+    return {
+        f"pc{i}": {"mac": f"00:11:22:33:{i // 256:02x}:{i % 256:02x}", "ip": f"192.0.2.{i % 254 + 1}"}
+        for i in range(count)
+    }
+
+
+def report(api, started, sent, pool_size, memory):
+    elapsed = time.monotonic() - started
+    latencies = list(api.latencies)
+    print(f"--- nach {elapsed:.0f} s ---")
+    print(f"Befehle gesendet: {sent}, beantwortet: {len(latencies)}, offen: {api.unanswered}")
+    print(f"Durchsatz: {len(latencies) / elapsed:.1f} Antworten/s")
+    if latencies:
+        print("Latenz: " + ", ".join(
+            f"p{p} {percentile(latencies, p) * 1000:.1f} ms" for p in (50, 90, 99)
+        ) + f", max {max(latencies) * 1000:.1f} ms")
+    print(f"Verbindungen: aktiv {api.active_connections}, Spitze {api.peak_connections} "
+          f"von {pool_size} (Pool) + getUpdates")
+    print(f"Gleichzeitige Anfragen: Spitze {api.peak_in_flight}")
+    print(f"Anfragen: {json.dumps(api.requests, sort_keys=True)}")
+    samples = [value for _, value in memory if value is not None]
+    if samples:
+        growth = samples[-1] - samples[0]
+        print(f"Speicher (RSS): Start {samples[0] / 1024:.1f} MiB, Ende {samples[-1] / 1024:.1f} MiB, "
+              f"Spitze {max(samples) / 1024:.1f} MiB, Zuwachs {growth / 1024:+.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50, help='Anzahl simulierter Benutzer')
+    parser.add_argument('--rate', type=float, default=20.0, help='Befehle pro Sekunde')
+    parser.add_argument('--duration', type=float, default=30.0, help='Dauer in Sekunden')
+    parser.add_argument('--commands', default='/list,/start,/history', help='Kommagetrennte Befehle')
+    parser.add_argument('--computers', type=int, default=20, help='Anzahl Computer im Inventar')
+    parser.add_argument('--pool-size', type=int, default=256, help='CONNECTION_POOL_SIZE des Bots')
+    parser.add_argument('--pool-timeout', type=float, default=30.0, help='POOL_TIMEOUT des Bots')
+    parser.add_argument('--report-interval', type=float, default=0, help='Zwischenberichte alle N Sekunden')
+    parser.add_argument('--memory-interval', type=float, default=5.0, help='Speicher-Messung alle N Sekunden')
+    args = parser.parse_args()
+
+    commands = [command.strip() for command in args.commands.split(',') if command.strip()]
+    users = [100000 + i for i in range(args.users)]
+
+    server = StubServer().start()
+    with tempfile.TemporaryDirectory() as work_dir:
+        with open(os.path.join(work_dir, 'computers.json'), 'w') as f:
+            json.dump(make_inventory(args.computers), f)
+
+        env = {
+            **os.environ,
+            'TELEGRAM_TOKEN': '123456:stub',
+            'TELEGRAM_BASE_URL': server.base_url,
+            'ALLOWED_USERS': ','.join(map(str, users)),
+            'CONNECTION_POOL_SIZE': str(args.pool_size),
+            'POOL_TIMEOUT': str(args.pool_timeout),
+            'LOG_LEVEL': 'WARNING'
+        }
+        bot = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, 'server.py')], cwd=work_dir, env=env)
+        try:
+            # Warten, bis der Bot Updates abholt
+            deadline = time.monotonic() + 30
+            while not server.api.requests.get('getUpdates'):
+                if bot.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Bot ist nicht gestartet")
+                time.sleep(0.1)
+
+            started = time.monotonic()
+            next_send = started
+            next_memory = started
+            next_report = started + args.report_interval if args.report_interval else None
+            memory = []
+            sent = 0
+            while time.monotonic() - started < args.duration:
+                now = time.monotonic()
+                if now >= next_memory:
+                    memory.append((now - started, rss_kib(bot.pid)))
+                    next_memory += args.memory_interval
+                if next_report and now >= next_report:
+                    report(server.api, started, sent, args.pool_size, memory)
+                    next_report += args.report_interval
+                if now < next_send:
+                    time.sleep(min(next_send - now, 0.05))
+                    continue
+                server.api.inject_command(random.choice(users), random.choice(commands))
+                sent += 1
+                next_send += 1 / args.rate
+
+            # Restliche Antworten abwarten
+            drain_deadline = time.monotonic() + args.pool_timeout
+            while server.api.unanswered and time.monotonic() < drain_deadline:
+                time.sleep(0.1)
+            memory.append((time.monotonic() - started, rss_kib(bot.pid)))
+            report(server.api, started, sent, args.pool_size, memory)
+        finally:
+            bot.terminate()
+            try:
+                bot.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                bot.kill()
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
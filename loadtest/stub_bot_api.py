@@ -0,0 +1,214 @@
+"""Lokaler Stub der Telegram Bot API für Last- und Dauertests
+
+Beantwortet getMe, deleteWebhook, getUpdates (Long Polling), sendMessage und
+editMessageText. Der Bot wird über TELEGRAM_BASE_URL=http://host:port/bot
+auf den Stub umgeleitet. Synthetische Befehle werden mit inject_command()
+eingespielt; jede Antwort des Bots (sendMessage) wird dem ältesten offenen
+Befehl desselben Chats zugeordnet, um die Ende-zu-Ende-Latenz zu messen.
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+BOT_USER = {
+    'id': 1,
+    'is_bot': True,
+    'first_name': 'Stub',
+    'username': 'stub_bot',
+    'can_join_groups': False,
+    'can_read_all_group_messages': False,
+    'supports_inline_queries': False
+}
+
+# Felder, die PTB als Klartext statt als JSON überträgt
+PLAIN_TEXT_FIELDS = ('text', 'parse_mode')
+
+
+class StubBotAPI:
+    """Zustand des Stubs: Update-Queue, offene Befehle und Messwerte"""
+
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._updates = []
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._pending = {}
+        self.latencies = []
+        self.requests = {}
+        self.active_connections = 0
+        self.peak_connections = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def inject_command(self, user_id, text):
+        """Stellt einen Befehl als Update für getUpdates bereit"""
+        command = text.split()[0]
+        with self._lock:
+            update = {
+                'update_id': self._next_update_id,
+                'message': {
+                    'message_id': self._next_message_id,
+                    'date': int(time.time()),
+                    'chat': {'id': user_id, 'type': 'private'},
+                    'from': {'id': user_id, 'is_bot': False, 'first_name': f'User{user_id}'},
+                    'text': text,
+                    'entities': [{'type': 'bot_command', 'offset': 0, 'length': len(command)}]
+                }
+            }
+            self._next_update_id += 1
+            self._next_message_id += 1
+            self._updates.append(update)
+            self._pending.setdefault(user_id, deque()).append(time.perf_counter())
+            self._lock.notify_all()
+
+    @property
+    def unanswered(self):
+        """Anzahl der Befehle ohne Antwort"""
+        with self._lock:
+            return sum(len(queue) for queue in self._pending.values())
+
+    def get_updates(self, offset, timeout):
+        """Long Polling: wartet bis zu timeout Sekunden auf neue Updates"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            if offset:
+                self._updates = [u for u in self._updates if u['update_id'] >= offset]
+            while not self._updates:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+            return list(self._updates[:100])
+
+    def new_message(self, chat_id, text):
+        """Erzeugt eine Bot-Nachricht und misst die Latenz des zugehörigen Befehls"""
+        with self._lock:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+            pending = self._pending.get(chat_id)
+            if pending:
+                self.latencies.append(time.perf_counter() - pending.popleft())
+        return self._message(message_id, chat_id, text)
+
+    def _message(self, message_id, chat_id, text):
+        return {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': BOT_USER,
+            'text': text
+        }
+
+    def handle(self, method, params):
+        """Beantwortet einen Bot-API-Aufruf"""
+        with self._lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+        if method == 'getMe':
+            return BOT_USER
+        if method == 'getUpdates':
+            return self.get_updates(int(params.get('offset', 0)), float(params.get('timeout', 0)))
+        if method == 'sendMessage':
+            return self.new_message(int(params['chat_id']), params.get('text', ''))
+        if method == 'editMessageText':
+            return self._message(int(params.get('message_id', 0)), int(params.get('chat_id', 0)), params.get('text', ''))
+        return True
+
+    def connection_opened(self):
+        with self._lock:
+            self.active_connections += 1
+            self.peak_connections = max(self.peak_connections, self.active_connections)
+
+    def connection_closed(self):
+        with self._lock:
+            self.active_connections -= 1
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+def _parse_params(handler):
+    length = int(handler.headers.get('Content-Length') or 0)
+    body = handler.rfile.read(length).decode('utf-8') if length else ''
+    if handler.headers.get('Content-Type', '').startswith('application/json'):
+        return json.loads(body or '{}')
+
+    params = {}
+    for key, value in parse_qsl(body, keep_blank_values=True):
+        if key in PLAIN_TEXT_FIELDS:
+            params[key] = value
+            continue
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.api.connection_opened()
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            self.server.api.connection_closed()
+
+    def do_POST(self):
+        api = self.server.api
+        api.request_started()
+        try:
+            method = self.path.rstrip('/').rsplit('/', 1)[-1]
+            result = api.handle(method, _parse_params(self))
+            body = json.dumps({'ok': True, 'result': result}).encode('utf-8')
+        except (KeyError, ValueError) as e:
+            body = json.dumps({'ok': False, 'error_code': 400, 'description': str(e)}).encode('utf-8')
+        finally:
+            api.request_finished()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP-Server für den Stub, läuft in einem eigenen Thread"""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), _Handler)
+        self.api = StubBotAPI()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='stub-bot-api', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,108 @@
+"""Nicht-blockierendes Logging
+
+Alle Log-Aufrufe landen in einer begrenzten Queue. Ein Hintergrund-Thread
+(logging.handlers.QueueListener) formatiert die Einträge und schreibt sie,
+sodass eine langsame Platte oder journald den asyncio-Loop nicht aufhält.
+Im aufrufenden Thread wird nur die Nachricht selbst zusammengesetzt;
+Tracebacks und JSON werden erst im Hintergrund-Thread erzeugt.
+
+Jeder Weckvorgang bekommt eine Korrelations-ID (job_id), die über eine
+ContextVar an alle Log-Einträge dieses Tasks angehängt wird.
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - [%(job_id)s] %(message)s'
+
+# Korrelations-ID des aktuellen Weckvorgangs
+job_id_var = contextvars.ContextVar('job_id', default='-')
+
+
+class JobIdFilter(logging.Filter):
+    """Hängt die Korrelations-ID des aktuellen Tasks an den Eintrag"""
+
+    def filter(self, record):
+        if not hasattr(record, 'job_id'):
+            record.job_id = job_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Gibt jeden Eintrag als einzeiliges JSON-Objekt aus"""
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'job_id': getattr(record, 'job_id', '-'),
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, der nie blockiert und volle Queues mitzählt"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Nur die Nachricht festhalten, damit sich Argumente nicht mehr ändern;
+        # Tracebacks formatiert erst der Hintergrund-Thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingPipeline:
+    """Queue-basiertes Logging mit Hintergrund-Thread"""
+
+    def __init__(self, level=logging.INFO, log_format='text', queue_size=10000, stream=None):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.handler.addFilter(JobIdFilter())
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+        self.listener = logging.handlers.QueueListener(self.queue, output, respect_handler_level=True)
+        self.level = level
+
+    def start(self):
+        """Ersetzt die Handler des Root-Loggers und startet den Schreib-Thread"""
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        self.listener.start()
+
+    def stop(self):
+        """Schreibt alle ausstehenden Einträge und beendet den Schreib-Thread"""
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+
+    @property
+    def depth(self):
+        """Anzahl noch nicht geschriebener Einträge"""
+        return self.queue.qsize()
+
+    @property
+    def dropped(self):
+        """Anzahl verworfener Einträge wegen voller Queue"""
+        return self.handler.dropped
@@ -0,0 +1,116 @@
+"""Datenmodell für gespeicherte Computer
+
+Computer hält MAC und IP in kanonischer Binärform (48-Bit-Zahl bzw.
+ipaddress.IPv4Address) und nutzt __slots__, damit auch große Inventare
+wenig Speicher brauchen. Geprüft wird einmal beim Laden; danach sind
+Vergleiche reine Zahlenvergleiche. Auf der Platte bleibt das bisherige
+JSON-Format ({"mac": "...", "ip": "..."}) erhalten.
+"""
+import ipaddress
+import re
+
+MAC_PATTERN = re.compile(r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$')
+IP_PATTERN = re.compile(r'^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$')
+
+
+def is_valid_mac(mac):
+    """Überprüft ob eine MAC-Adresse gültig ist"""
+    return bool(MAC_PATTERN.match(mac))
+
+
+def is_valid_ip(ip):
+    """Überprüft ob eine IP-Adresse gültig ist"""
+    if not IP_PATTERN.match(ip):
+        return False
+    return all(0 <= int(part) <= 255 for part in ip.split('.'))
+
+
+def parse_mac(mac):
+    """Wandelt eine MAC-Adresse in eine 48-Bit-Zahl um"""
+    if not is_valid_mac(mac):
+        raise ValueError(f"Ungültige MAC-Adresse: {mac}")
+    return int(mac[0:2] + mac[3:5] + mac[6:8] + mac[9:11] + mac[12:14] + mac[15:17], 16)
+
+
+def format_mac(value):
+    """Kanonische Schreibweise einer MAC-Adresse: AA:BB:CC:DD:EE:FF"""
+    text = f"{value:012X}"
+    return ':'.join(text[i:i + 2] for i in range(0, 12, 2))
+
+
+def parse_ip(ip):
+    """Wandelt eine IP-Adresse in ipaddress.IPv4Address um (führende Nullen erlaubt)"""
+    if not IP_PATTERN.match(ip):
+        raise ValueError(f"Ungültige IP-Adresse: {ip}")
+    value = 0
+    for part in ip.split('.'):
+        part = int(part)
+        if part > 255:
+            raise ValueError(f"Ungültige IP-Adresse: {ip}")
+        value = value << 8 | part
+    # Aus der Zahl zu bauen ist deutlich schneller als den String erneut zu parsen
+    return ipaddress.IPv4Address(value)
+
+
+class Computer:
+    """Ein gespeicherter Computer mit geprüften, kanonischen Feldern"""
+
+    __slots__ = ('name', 'mac', 'ip', 'broadcast', 'port')
+
+    def __init__(self, name, mac, ip, broadcast=None, port=None):
+        self.name = name
+        self.mac = mac
+        self.ip = ip
+        self.broadcast = broadcast
+        self.port = port
+
+    @classmethod
+    def from_dict(cls, name, data):
+        """Erstellt einen Computer aus einem Eintrag von computers.json; wirft ValueError"""
+        try:
+            mac, ip = data['mac'], data['ip']
+        except (KeyError, TypeError):
+            raise ValueError(f"Eintrag '{name}' braucht 'mac' und 'ip'") from None
+        broadcast = data.get('broadcast')
+        # Von Hand bearbeitete Dateien können beliebige JSON-Typen enthalten
+        for field, value in (('mac', mac), ('ip', ip), ('broadcast', broadcast)):
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"Feld '{field}' muss ein String sein: {value!r}")
+        if mac is None or ip is None:
+            raise ValueError(f"Eintrag '{name}' braucht 'mac' und 'ip'")
+        port = data.get('port')
+        if port is not None:
+            try:
+                port = int(port)
+            except (TypeError, ValueError):
+                raise ValueError(f"Ungültiger Port: {port!r}") from None
+            if not 0 < port < 65536:
+                raise ValueError(f"Ungültiger Port: {port}")
+        return cls(
+            name,
+            parse_mac(mac),
+            parse_ip(ip),
+            parse_ip(broadcast) if broadcast else None,
+            port
+        )
+
+    def to_dict(self):
+        """Eintrag für computers.json in kanonischer Schreibweise"""
+        data = {'mac': self.mac_str, 'ip': str(self.ip)}
+        if self.broadcast is not None:
+            data['broadcast'] = str(self.broadcast)
+        if self.port is not None:
+            data['port'] = self.port
+        return data
+
+    @property
+    def mac_str(self):
+        return format_mac(self.mac)
+
+    def __eq__(self, other):
+        if not isinstance(other, Computer):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        return f"Computer({self.name!r}, {self.mac_str}, {self.ip})"
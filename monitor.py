@@ -0,0 +1,140 @@
+"""Überwachung des asyncio-Loops
+
+LoopLagMonitor misst regelmäßig, wie viel später als geplant ein
+asyncio.sleep zurückkehrt (Loop-Lag). Zusätzlich schlägt der Loop alle
+threshold/2 Sekunden einen Herzschlag, und ein Watchdog-Thread prüft,
+wann der letzte war: Liegt er mindestens threshold zurück, blockiert
+gerade ein Callback, und dessen aktueller Stack wird geloggt - also genau
+die Stelle, die blockiert (z.B. subprocess.call oder gethostbyaddr).
+
+sample_stacks() ist ein einfacher Sampling-Profiler für den Loop-Thread
+über ein festes Zeitfenster, ohne zusätzliche Abhängigkeiten.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(len(values) * p / 100) - 1))]
+
+
+class LoopLagMonitor:
+    """Misst den Loop-Lag und loggt den Stack blockierender Callbacks"""
+
+    def __init__(self, interval=0.5, threshold=0.25, history=1200):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags = deque(maxlen=history)
+        self.stalls = 0
+        self.loop_thread_id = None
+        self._last_beat = time.monotonic()
+        self._task = None
+        self._beat_handle = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Startet Messung und Watchdog; muss im Loop-Thread aufgerufen werden"""
+        self.loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        loop = asyncio.get_running_loop()
+        self._task = loop.create_task(self._sample())
+        if self.threshold > 0:
+            # Herzschlag feiner als threshold, damit jede Blockade ab threshold auffällt
+            self._beat_handle = loop.call_later(self.threshold / 2, self._beat)
+            self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+            self._watchdog.start()
+        return self._task
+
+    def stop(self):
+        self._stopped.set()
+        if self._beat_handle is not None:
+            self._beat_handle.cancel()
+            self._beat_handle = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self):
+        while True:
+            scheduled = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.monotonic() - scheduled - self.interval))
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+        self._beat_handle = asyncio.get_running_loop().call_later(self.threshold / 2, self._beat)
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stopped.wait(self.threshold / 4):
+            beat = self._last_beat
+            # Ohne Blockade liegt der letzte Herzschlag höchstens threshold/2 zurück
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '(kein Stack verfügbar)'
+            logger.warning("Event-Loop blockiert seit mindestens %.0f ms:\n%s", stalled * 1000, stack)
+
+    def summary(self):
+        """Perzentile des Loop-Lags in Sekunden"""
+        lags = list(self.lags)
+        return {
+            'samples': len(lags),
+            'p50': percentile(lags, 50),
+            'p95': percentile(lags, 95),
+            'p99': percentile(lags, 99),
+            'max': max(lags) if lags else None
+        }
+
+
+def sample_stacks(thread_id, duration, interval=0.005, limit=15):
+    """Sampelt den Stack eines Threads und zählt die häufigsten Funktionen
+
+    Liefert (Anzahl Samples, oberste, kumulativ): oberste ist eine Liste
+    [(Anteil, Funktion mit Zeile), ...] für die oberste Zeile des Stacks,
+    kumulativ dieselbe Liste für alle Funktionen auf dem Stack.
+    """
+    own = Counter()
+    cumulative = Counter()
+    samples = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            samples += 1
+            seen = set()
+            top = True
+            while frame is not None:
+                code = frame.f_code
+                key = f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno if top else code.co_firstlineno})"
+                if top:
+                    own[key] += 1
+                    top = False
+                function = (code.co_filename, code.co_name)
+                if function not in seen:
+                    seen.add(function)
+                    cumulative[f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]})"] += 1
+                frame = frame.f_back
+        time.sleep(interval)
+    if not samples:
+        return 0, [], []
+    return (
+        samples,
+        [(count / samples, key) for key, count in own.most_common(limit)],
+        [(count / samples, key) for key, count in cumulative.most_common(limit)]
+    )
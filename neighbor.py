@@ -0,0 +1,137 @@
+"""Ereignisgesteuerte Online-Erkennung über rtnetlink (nur Linux)
+
+Der Kernel meldet über NETLINK_ROUTE (Gruppe RTMGRP_NEIGH) jede Änderung
+der Neighbor-Tabelle (ARP-Cache). Bootet ein Computer und antwortet auf ARP
+oder sendet selbst ARP-Anfragen an diesen Host, erscheint seine MAC dort.
+Laufende Weckvorgänge werden dann sofort geweckt und bestätigen den Status
+mit einem Ping. Das Abonnieren braucht keine Root-Rechte.
+
+Die Meldungen sind nur ein Hinweis: Erst der Ping entscheidet. Ohne
+Netlink (andere Systeme, Container ohne Netlink) bleibt es beim Polling.
+"""
+import asyncio
+import logging
+import socket
+import struct
+
+logger = logging.getLogger(__name__)
+
+NETLINK_ROUTE = 0
+RTMGRP_NEIGH = 0x4
+RTM_NEWNEIGH = 28
+NDA_DST = 1
+NDA_LLADDR = 2
+
+# Zustände, in denen der Kernel eine Antwort oder ein Paket des Nachbarn gesehen hat;
+# DELAY/PROBE entstehen schon durch eigene Pings an schlafende Computer
+NUD_REACHABLE = 0x02
+NUD_STALE = 0x04
+NUD_SEEN = NUD_REACHABLE | NUD_STALE
+
+NLMSGHDR = struct.Struct('=LHHLL')
+NDMSG = struct.Struct('=BxxxiHBB')
+RTATTR = struct.Struct('=HH')
+
+
+def _align(length):
+    return (length + 3) & ~3
+
+
+def mac_key(mac):
+    """MAC-Adresse als Zahl, unabhängig von Trennzeichen und Schreibweise"""
+    return int(mac.replace(':', '').replace('-', ''), 16)
+
+
+def parse_neighbor_messages(data):
+    """Liefert (Zustand, IP, MAC als Zahl) für jede RTM_NEWNEIGH-Meldung"""
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length, msg_type = NLMSGHDR.unpack_from(data, offset)[:2]
+        if length < NLMSGHDR.size:
+            break
+        end = offset + length
+        if msg_type == RTM_NEWNEIGH and end - offset >= NLMSGHDR.size + NDMSG.size:
+            family, _, state, _, _ = NDMSG.unpack_from(data, offset + NLMSGHDR.size)
+            ip = mac = None
+            attr = offset + NLMSGHDR.size + NDMSG.size
+            while attr + RTATTR.size <= end:
+                attr_len, attr_type = RTATTR.unpack_from(data, attr)
+                if attr_len < RTATTR.size:
+                    break
+                value = data[attr + RTATTR.size:attr + attr_len]
+                if attr_type == NDA_DST and family == socket.AF_INET and len(value) == 4:
+                    ip = socket.inet_ntoa(value)
+                elif attr_type == NDA_LLADDR and len(value) == 6:
+                    mac = int.from_bytes(value, 'big')
+                attr += _align(attr_len)
+            if mac is not None:
+                yield state, ip, mac
+        offset += _align(length)
+
+
+class NeighborWatcher:
+    """Abonniert Neighbor-Meldungen und weckt wartende Weckvorgänge"""
+
+    def __init__(self):
+        self._sock = None
+        self._loop = None
+        self._waiters = {}
+
+    def start(self, loop=None):
+        """Öffnet den Netlink-Socket; wirft OSError, wenn das nicht möglich ist"""
+        self._loop = loop or asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        try:
+            sock.bind((0, RTMGRP_NEIGH))
+            sock.setblocking(False)
+            self._loop.add_reader(sock.fileno(), self._on_readable)
+        except (OSError, NotImplementedError):
+            sock.close()
+            raise
+        self._sock = sock
+
+    def stop(self):
+        if self._sock is not None:
+            self._loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+
+    def register(self, mac):
+        """Gibt ein Event zurück, das gesetzt wird, sobald die MAC gemeldet wird"""
+        event = asyncio.Event()
+        self._waiters.setdefault(mac_key(mac), set()).add(event)
+        return event
+
+    def unregister(self, mac, event):
+        key = mac_key(mac)
+        waiters = self._waiters.get(key)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                del self._waiters[key]
+
+    @property
+    def pending(self):
+        """Anzahl der MAC-Adressen, auf die gewartet wird"""
+        return len(self._waiters)
+
+    def _on_readable(self):
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # z.B. ENOBUFS bei Überlauf; Polling deckt verlorene Meldungen ab
+                logger.warning("Fehler beim Lesen der Neighbor-Meldungen: %s", e)
+                return
+            self.dispatch(data)
+
+    def dispatch(self, data):
+        """Verarbeitet rohe Netlink-Daten"""
+        for state, ip, mac in parse_neighbor_messages(data):
+            if not state & NUD_SEEN:
+                continue
+            for event in self._waiters.get(mac, ()):
+                logger.debug("Neighbor-Meldung für %012x (%s), Zustand %#x", mac, ip, state)
+                event.set()
@@ -0,0 +1,144 @@
+"""Ermittelt Ziel-Adresse und Interface für Wake-on-LAN-Pakete
+
+Auf Hosts mit mehreren Netzwerkkarten verlässt ein Paket an
+255.255.255.255 oft das falsche Interface. Deshalb wird für jeden Computer
+anhand seiner IP und der Routing-Tabelle (/proc/net/route) das passende
+Netz gesucht. Für direkt angebundene Netze wird an deren Directed-Broadcast
+(z.B. 192.168.2.255) gesendet, gebunden an die lokale Adresse des
+Interfaces. Die Ergebnisse werden pro Netz zwischengespeichert.
+
+Ohne Routing-Tabelle (z.B. unter Windows) bleibt es beim Standardverhalten
+von wakeonlan.
+"""
+import ipaddress
+import logging
+import socket
+import struct
+import threading
+import time
+from typing import NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ROUTE_FILE = '/proc/net/route'
+ROUTE_CACHE_TTL = 60  # Sekunden, danach wird die Routing-Tabelle neu gelesen
+DEFAULT_BROADCAST = '255.255.255.255'
+DEFAULT_PORT = 9
+SIOCGIFADDR = 0x8915
+
+
+class Route(NamedTuple):
+    network: ipaddress.IPv4Network
+    interface: str
+    gateway: Optional[ipaddress.IPv4Address]
+    metric: int
+
+
+class WolTarget(NamedTuple):
+    """Parameter für wakeonlan.send_magic_packet"""
+    ip_address: str = DEFAULT_BROADCAST
+    port: int = DEFAULT_PORT
+    interface: Optional[str] = None  # Lokale Quell-Adresse
+
+
+def _hex_to_ip(value):
+    return ipaddress.IPv4Address(struct.pack('<L', int(value, 16)))
+
+
+def read_routes(path=ROUTE_FILE):
+    """Liest die IPv4-Routing-Tabelle des Kernels"""
+    routes = []
+    try:
+        with open(path, 'r') as f:
+            next(f, None)  # Kopfzeile
+            for line in f:
+                fields = line.split()
+                if len(fields) < 8:
+                    continue
+                flags = int(fields[3], 16)
+                if not flags & 0x1:  # RTF_UP
+                    continue
+                gateway = _hex_to_ip(fields[2])
+                network = ipaddress.IPv4Network(f"{_hex_to_ip(fields[1])}/{_hex_to_ip(fields[7])}", strict=False)
+                routes.append(Route(network, fields[0], gateway if int(gateway) else None, int(fields[6])))
+    except OSError:
+        return []
+    return routes
+
+
+def interface_address(interface):
+    """Lokale IPv4-Adresse eines Interfaces (nur Linux)"""
+    if fcntl is None:
+        return None
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            packed = fcntl.ioctl(s.fileno(), SIOCGIFADDR, struct.pack('256s', interface.encode('utf-8')[:15]))
+        return socket.inet_ntoa(packed[20:24])
+    except OSError:
+        return None
+
+
+class WolTargetResolver:
+    """Bestimmt und cached Broadcast-Adresse und Interface pro Netz"""
+
+    def __init__(self, route_reader=read_routes, address_reader=interface_address, ttl=ROUTE_CACHE_TTL):
+        self._route_reader = route_reader
+        self._address_reader = address_reader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._routes = None
+        self._loaded_at = 0.0
+        self._targets = {}
+
+    def invalidate(self):
+        """Verwirft die zwischengespeicherte Routing-Tabelle"""
+        with self._lock:
+            self._routes = None
+            self._targets.clear()
+
+    def _current_routes(self):
+        now = time.monotonic()
+        if self._routes is None or now - self._loaded_at > self._ttl:
+            # Spezifischste Route zuerst, bei Gleichstand die mit kleinster Metrik
+            self._routes = sorted(self._route_reader(), key=lambda r: (-r.network.prefixlen, r.metric))
+            self._targets.clear()
+            self._loaded_at = now
+        return self._routes
+
+    def _target_for_route(self, route):
+        target = self._targets.get(route)
+        if target is None:
+            if route.gateway is None and route.network.prefixlen < 31:
+                broadcast = str(route.network.broadcast_address)
+            else:
+                # Entferntes Netz: Maske unbekannt, nur das Interface ist sicher
+                broadcast = DEFAULT_BROADCAST
+            target = self._targets[route] = WolTarget(broadcast, DEFAULT_PORT, self._address_reader(route.interface))
+            logger.debug("WoL-Ziel für %s über %s: %s", route.network, route.interface, target)
+        return target
+
+    def resolve(self, ip, broadcast=None, port=None):
+        """Gibt das WoL-Ziel für einen Computer zurück; broadcast und port überschreiben"""
+        target = WolTarget()
+        try:
+            address = ipaddress.IPv4Address(ip)
+        except ValueError:
+            address = None
+
+        if address is not None:
+            with self._lock:
+                for route in self._current_routes():
+                    if address in route.network:
+                        target = self._target_for_route(route)
+                        break
+
+        if broadcast:
+            target = target._replace(ip_address=broadcast)
+        if port:
+            target = target._replace(port=int(port))
+        return target
@@ -0,0 +1,121 @@
+"""Fernsteuerung der Computer über SSH
+
+SSHPool führt Befehle mit dem OpenSSH-Client aus und nutzt dessen
+Multiplexing: Die erste Verbindung zu einem Host bleibt als Master im
+Hintergrund offen (ControlMaster/ControlPersist), weitere Befehle laufen
+ohne neuen Verbindungsaufbau und Schlüsselaustausch über denselben Socket.
+Ein Semaphor begrenzt, wie viele Befehle gleichzeitig laufen. Beim Beenden
+werden alle noch offenen Master geschlossen.
+
+Statt ssh kann jedes Programm mit derselben Aufrufkonvention eingesetzt
+werden (SSH_COMMAND), z.B. tests/fake_ssh.py für Tests ohne echte Hosts.
+"""
+import asyncio
+import logging
+import os
+import stat
+import tempfile
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Exit-Code von ssh bei Verbindungsfehlern; auch wenn der Host die
+# Verbindung beim Herunterfahren oder Einschlafen selbst trennt
+SSH_CONNECTION_ERROR = 255
+
+
+class SSHResult(NamedTuple):
+    returncode: int
+    output: str
+
+
+def default_control_dir():
+    """Verzeichnis für die Control-Sockets, nur für den eigenen Benutzer"""
+    return os.path.join(tempfile.gettempdir(), f"wol-bot-ssh-{os.getuid() if hasattr(os, 'getuid') else 'user'}")
+
+
+def ensure_private_dir(path):
+    """Legt path an und prüft, dass nur der eigene Benutzer darauf zugreifen kann
+
+    Das Verzeichnis liegt standardmäßig unter einem vorhersagbaren Namen im
+    temporären Verzeichnis. Hätte ein anderer Benutzer es vorher angelegt,
+    könnte er dort einen falschen Master-Socket ablegen und die Befehle
+    abfangen. Wirft PermissionError, wenn Besitzer oder Rechte nicht passen.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        return
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != 0o700:
+        raise PermissionError(
+            f"Unsicheres SSH-Control-Verzeichnis {path}: muss ein Verzeichnis des eigenen Benutzers mit Rechten 0700 sein"
+        )
+
+
+class SSHPool:
+    """Persistente, gemultiplexte SSH-Verbindungen mit begrenzter Parallelität"""
+
+    def __init__(self, ssh_command=('ssh',), user=None, control_dir=None, control_persist=300,
+                 max_parallel=4, connect_timeout=10):
+        self.ssh_command = tuple(ssh_command)
+        self.user = user
+        self.control_dir = control_dir or default_control_dir()
+        self.control_persist = control_persist
+        self.max_parallel = max_parallel
+        self.connect_timeout = connect_timeout
+        self._semaphore = asyncio.Semaphore(max_parallel)
+        self._hosts = set()
+
+    def target(self, host):
+        return f"{self.user}@{host}" if self.user else host
+
+    def _options(self):
+        return [
+            '-o', 'BatchMode=yes',
+            '-o', f'ConnectTimeout={int(self.connect_timeout)}',
+            '-o', 'ControlMaster=auto',
+            '-o', f'ControlPath={os.path.join(self.control_dir, "%C")}',
+            '-o', f'ControlPersist={int(self.control_persist)}'
+        ]
+
+    @property
+    def hosts(self):
+        """Hosts, zu denen möglicherweise noch ein Master offen ist"""
+        return frozenset(self._hosts)
+
+    async def run(self, host, command, timeout=None):
+        """Führt command auf host aus; wirft asyncio.TimeoutError nach timeout Sekunden"""
+        ensure_private_dir(self.control_dir)
+        args = [*self.ssh_command, *self._options(), self.target(host), command]
+        async with self._semaphore:
+            self._hosts.add(host)
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT
+            )
+            try:
+                output, _ = await asyncio.wait_for(process.communicate(), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                process.kill()
+                await process.wait()
+                raise
+        result = SSHResult(process.returncode, output.decode('utf-8', errors='replace').strip())
+        logger.debug("SSH %s: %r -> %d", host, command, result.returncode)
+        return result
+
+    async def close(self):
+        """Schließt alle Master-Verbindungen"""
+        hosts, self._hosts = self._hosts, set()
+        for host in hosts:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *self.ssh_command, *self._options(), '-O', 'exit', self.target(host),
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                await process.wait()
+            except OSError as e:
+                logger.warning("SSH-Verbindung zu %s konnte nicht geschlossen werden: %s", host, e)
@@ -1,23 +1,41 @@
 from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
 from telegram import Update
 from wakeonlan import send_magic_packet
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 import os
 import json
 import logging
-import re
 import asyncio
 import platform
 import subprocess
 from telegram.request import HTTPXRequest
-from telegram.error import TimedOut, NetworkError
+from telegram.error import TelegramError, TimedOut, NetworkError
 import socket
-
-# Logging konfigurieren
-logging.basicConfig(
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+from collections import Counter
+import sqlite3
+import signal
+import threading
+import time
+import uuid
+import functools
+import math
+import shlex
+from dataclasses import dataclass
+from sqlite_store import open_store
+from models import Computer, is_valid_mac, is_valid_ip, parse_mac
+from concurrency import UserUpdateProcessor, update_user_id
+from remote import SSHPool, SSH_CONNECTION_ERROR
+from netinfo import WolTargetResolver
+from neighbor import NeighborWatcher
+from monitor import LoopLagMonitor, sample_stacks
+from logging_setup import LoggingPipeline, job_id_var
+from wake_journal import WakeJournal
+from history import (
+    EventLog, compute_stats, make_event,
+    RESULT_ALREADY_ONLINE, RESULT_ONLINE, RESULT_TIMEOUT, RESULT_ERROR
 )
+
+# Logging wird in main() über setup_logging() eingerichtet
 logger = logging.getLogger(__name__)
 
 # Emoji Konstanten
@@ -31,80 +49,344 @@ EMOJI = {
     'GREEN_CIRCLE': '🟢',
     'RED_CIRCLE': '🔴',
     'FLOPPY': '💾',
-    'MEMO': '📝'
+    'MEMO': '📝',
+    'HOURGLASS': '⏳',
+    'SLEEP': '💤'
+}
+
+ENV_FILE = '.env'
+
+# Standardwerte für alle Einstellungen
+ENV_DEFAULTS = {
+    'CONNECT_TIMEOUT': '30.0',
+    'READ_TIMEOUT': '30.0',
+    'WRITE_TIMEOUT': '30.0',
+    'POOL_TIMEOUT': '30.0',
+    'CONNECTION_POOL_SIZE': '256',
+    'MAX_TRIES': '30',
+    'CHECK_INTERVAL': '10',
+    'COMPUTERS_FILE': 'computers.json',
+    'CONFIG_WATCH_INTERVAL': '5',
+    'STORAGE_BACKEND': 'json',
+    'DATABASE_FILE': 'computers.db',
+    'HISTORY_FILE': 'history.log',
+    'HISTORY_MAX_BYTES': '1048576',
+    'HISTORY_BACKUPS': '3',
+    'LOG_LEVEL': 'INFO',
+    'LOG_FORMAT': 'text',
+    'LOG_QUEUE_SIZE': '10000',
+    'NEIGHBOR_DETECTION': 'false',
+    'WAKE_JOURNAL_FILE': 'wake_jobs.json',
+    'SHUTDOWN_TIMEOUT': '10',
+    'DROP_PENDING_UPDATES': 'false',
+    'LOOP_LAG_THRESHOLD': '0.25',
+    'CONCURRENT_UPDATES': '32',
+    'PER_USER_CONCURRENCY': '4',
+    'PING_CONCURRENCY': '64',
+    'SSH_COMMAND': 'ssh',
+    'SSH_MAX_PARALLEL': '4',
+    'SSH_CONTROL_PERSIST': '300',
+    'SSH_TIMEOUT': '30',
+    'SLEEP_COMMAND': 'sudo systemctl suspend',
+    'SHUTDOWN_COMMAND': 'sudo systemctl poweroff',
+    'OFFLINE_TIMEOUT': '120'
 }
 
-def ensure_env_defaults(env_path='.env'):
+# Einstellungen ohne Standardwert in der .env-Datei
+OPTIONAL_SETTINGS = ('TELEGRAM_TOKEN', 'ALLOWED_USERS', 'ADMIN_USERS', 'TELEGRAM_BASE_URL', 'SSH_USER', 'SSH_CONTROL_DIR')
+
+DEFAULT_TELEGRAM_BASE_URL = 'https://api.telegram.org/bot'
+
+STORAGE_BACKENDS = ('json', 'sqlite')
+LOG_FORMATS = ('text', 'json')
+
+def ensure_env_defaults(env_path=ENV_FILE):
     """Stellt sicher, dass alle Standardwerte in der .env-Datei vorhanden sind"""
-    defaults = {
-        'CONNECT_TIMEOUT': '30.0',
-        'READ_TIMEOUT': '30.0',
-        'WRITE_TIMEOUT': '30.0',
-        'POOL_TIMEOUT': '30.0',
-        'MAX_TRIES': '30',
-        'CHECK_INTERVAL': '10',
-        'COMPUTERS_FILE': 'computers.json'
-    }
-    
-    # Existierende Werte laden
-    existing_values = {}
+    # Existierende Schlüssel ermitteln
+    existing_keys = set()
+    content = ''
     if os.path.exists(env_path):
         with open(env_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if '=' in line and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    existing_values[key] = value
-
-    # Fehlende Werte hinzufügen
-    needs_update = False
-    for key, value in defaults.items():
-        if key not in existing_values:
-            existing_values[key] = value
-            needs_update = True
-            logger.info(f"Füge Standardwert hinzu: {key}={value}")
-
-    # Datei aktualisieren, wenn Änderungen vorgenommen wurden
-    if needs_update:
-        with open(env_path, 'w', encoding='utf-8') as f:
-            for key, value in existing_values.items():
-                f.write(f"{key}={value}\n")
-        logger.info("Standardwerte wurden zur .env-Datei hinzugefügt")
-
-# Standardwerte sicherstellen
-ensure_env_defaults()
-
-# Umgebungsvariablen laden
-load_dotenv()
-TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
-ALLOWED_USERS = [int(id) for id in os.getenv('ALLOWED_USERS', '').split(',') if id]
-COMPUTERS_FILE = os.getenv('COMPUTERS_FILE', 'computers.json')
-MAX_TRIES = int(os.getenv('MAX_TRIES', '30'))  # Anzahl der Versuche für Computer-Status-Check
-CHECK_INTERVAL = int(os.getenv('CHECK_INTERVAL', '10'))  # Wartezeit zwischen Status-Checks in Sekunden
-# Timeout-Einstellungen
-CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', '30.0'))  # Verbindungs-Timeout in Sekunden
-READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', '30.0'))  # Lese-Timeout in Sekunden
-WRITE_TIMEOUT = float(os.getenv('WRITE_TIMEOUT', '30.0'))  # Schreib-Timeout in Sekunden
-POOL_TIMEOUT = float(os.getenv('POOL_TIMEOUT', '30.0'))  # Pool-Timeout in Sekunden
-
-# Debug-Ausgabe der Konfiguration
-logger.debug(f"Geladene Konfiguration:")
-logger.debug(f"Token verfügbar: {'Ja' if TELEGRAM_TOKEN else 'Nein'}")
-logger.debug(f"Erlaubte Benutzer: {ALLOWED_USERS}")
+            content = f.read()
+        for line in content.splitlines():
+            line = line.strip()
+            if '=' in line and not line.startswith('#'):
+                existing_keys.add(line.split('=', 1)[0].strip())
+
+    # Fehlende Werte ermitteln
+    missing = {key: value for key, value in ENV_DEFAULTS.items() if key not in existing_keys}
+    if not missing:
+        return
+
+    # Fehlende Werte anhängen, Kommentare und Reihenfolge bleiben erhalten
+    with open(env_path, 'a', encoding='utf-8') as f:
+        if content and not content.endswith('\n'):
+            f.write('\n')
+        for key, value in missing.items():
+            logger.info("Füge Standardwert hinzu: %s=%s", key, value)
+            f.write(f"{key}={value}\n")
+    logger.info("Standardwerte wurden zur .env-Datei hinzugefügt")
+
+def _parse_bool(value):
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _parse_number(values, key, convert, minimum, exclusive=False):
+    """Liest eine Zahl und prüft ihre Untergrenze; wirft ValueError bei ungültigen Werten"""
+    value = convert(values[key])
+    if not math.isfinite(value) or value < minimum or (exclusive and value == minimum):
+        bound = f"größer als {minimum}" if exclusive else f"mindestens {minimum}"
+        raise ValueError(f"{key} muss {bound} sein: {values[key]}")
+    return value
+
+def _parse_users(value):
+    # frozenset, damit die Berechtigungsprüfung unabhängig von der Anzahl der Benutzer ist
+    return frozenset(int(id) for id in value.split(',') if id.strip())
+
+@dataclass(frozen=True)
+class Config:
+    """Unveränderlicher Schnappschuss der Konfiguration"""
+    telegram_token: str
+    allowed_users: frozenset
+    computers_file: str
+    max_tries: int  # Anzahl der Versuche für Computer-Status-Check
+    check_interval: int  # Wartezeit zwischen Status-Checks in Sekunden
+    connect_timeout: float  # Verbindungs-Timeout in Sekunden
+    read_timeout: float  # Lese-Timeout in Sekunden
+    write_timeout: float  # Schreib-Timeout in Sekunden
+    pool_timeout: float  # Pool-Timeout in Sekunden
+    connection_pool_size: int  # Maximale Anzahl gleichzeitiger Verbindungen zur Bot API
+    telegram_base_url: str  # Basis-URL der Bot API, z.B. für einen lokalen Test-Server
+    config_watch_interval: float  # Prüfintervall für Änderungen an der .env-Datei, 0 = aus
+    storage_backend: str  # 'json' oder 'sqlite'
+    database_file: str  # SQLite-Datenbank für STORAGE_BACKEND=sqlite
+    history_file: str  # Verlauf der Weckvorgänge
+    history_max_bytes: int  # Größe, ab der der Verlauf rotiert wird
+    history_backups: int  # Anzahl aufbewahrter rotierter Verlaufsdateien
+    log_level: int
+    log_format: str  # 'text' oder 'json'
+    log_queue_size: int  # Maximale Anzahl ungeschriebener Log-Einträge
+    neighbor_detection: bool  # Online-Erkennung über Netlink-Neighbor-Meldungen (nur Linux)
+    wake_journal_file: str  # Journal laufender Weckvorgänge für die Fortsetzung nach Neustarts
+    shutdown_timeout: float  # Wartezeit auf laufende Weckvorgänge beim Beenden in Sekunden
+    drop_pending_updates: bool  # Beim Start aufgelaufene Befehle verwerfen
+    admin_users: frozenset  # Benutzer mit Zugriff auf /debug
+    loop_lag_threshold: float  # Ab dieser Blockade des Event-Loops in Sekunden wird der Stack geloggt, 0 = aus
+    concurrent_updates: int  # Maximale Anzahl gleichzeitig verarbeiteter Updates
+    per_user_concurrency: int  # Maximale Anzahl gleichzeitig verarbeiteter Updates pro Benutzer
+    ping_concurrency: int  # Maximale Anzahl gleichzeitiger Pings bei /status
+    ssh_command: tuple  # SSH-Client samt Argumenten, z.B. für einen lokalen Ersatz in Tests
+    ssh_user: str  # Benutzer für SSH, leer = Vorgabe aus ~/.ssh/config
+    ssh_control_dir: str  # Verzeichnis der Control-Sockets, leer = im temporären Verzeichnis
+    ssh_max_parallel: int  # Maximale Anzahl gleichzeitig laufender SSH-Befehle
+    ssh_control_persist: int  # Sekunden, die eine ungenutzte SSH-Verbindung offen bleibt
+    ssh_timeout: float  # Zeitlimit für einen SSH-Befehl in Sekunden
+    sleep_command: str  # Befehl für /sleep auf dem Computer
+    shutdown_command: str  # Befehl für /shutdown auf dem Computer
+    offline_timeout: float  # Wartezeit, bis ein Computer nach /sleep oder /shutdown offline sein muss
+
+    @classmethod
+    def from_env(cls, env_path=ENV_FILE):
+        """Liest die Konfiguration aus der .env-Datei; Umgebungsvariablen haben Vorrang"""
+        values = dict(ENV_DEFAULTS)
+        values.update({key: value for key, value in dotenv_values(env_path).items() if value is not None})
+        values.update({key: os.environ[key] for key in (*OPTIONAL_SETTINGS, *ENV_DEFAULTS) if key in os.environ})
+        storage_backend = values['STORAGE_BACKEND'].strip().lower()
+        if storage_backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unbekanntes STORAGE_BACKEND: {storage_backend}")
+        log_level = getattr(logging, values['LOG_LEVEL'].strip().upper(), None)
+        if not isinstance(log_level, int):
+            raise ValueError(f"Unbekanntes LOG_LEVEL: {values['LOG_LEVEL']}")
+        log_format = values['LOG_FORMAT'].strip().lower()
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Unbekanntes LOG_FORMAT: {log_format}")
+        return cls(
+            telegram_token=values.get('TELEGRAM_TOKEN'),
+            allowed_users=_parse_users(values.get('ALLOWED_USERS', '')),
+            computers_file=values['COMPUTERS_FILE'],
+            max_tries=_parse_number(values, 'MAX_TRIES', int, 1),
+            check_interval=_parse_number(values, 'CHECK_INTERVAL', int, 0),
+            connect_timeout=_parse_number(values, 'CONNECT_TIMEOUT', float, 0, exclusive=True),
+            read_timeout=_parse_number(values, 'READ_TIMEOUT', float, 0, exclusive=True),
+            write_timeout=_parse_number(values, 'WRITE_TIMEOUT', float, 0, exclusive=True),
+            pool_timeout=_parse_number(values, 'POOL_TIMEOUT', float, 0, exclusive=True),
+            connection_pool_size=_parse_number(values, 'CONNECTION_POOL_SIZE', int, 1),
+            telegram_base_url=values.get('TELEGRAM_BASE_URL') or DEFAULT_TELEGRAM_BASE_URL,
+            config_watch_interval=_parse_number(values, 'CONFIG_WATCH_INTERVAL', float, 0),
+            storage_backend=storage_backend,
+            database_file=values['DATABASE_FILE'],
+            history_file=values['HISTORY_FILE'],
+            history_max_bytes=_parse_number(values, 'HISTORY_MAX_BYTES', int, 0),
+            history_backups=_parse_number(values, 'HISTORY_BACKUPS', int, 0),
+            log_level=log_level,
+            log_format=log_format,
+            log_queue_size=_parse_number(values, 'LOG_QUEUE_SIZE', int, 0),
+            neighbor_detection=_parse_bool(values['NEIGHBOR_DETECTION']),
+            wake_journal_file=values['WAKE_JOURNAL_FILE'],
+            shutdown_timeout=_parse_number(values, 'SHUTDOWN_TIMEOUT', float, 0),
+            drop_pending_updates=_parse_bool(values['DROP_PENDING_UPDATES']),
+            admin_users=_parse_users(values.get('ADMIN_USERS', '')),
+            loop_lag_threshold=_parse_number(values, 'LOOP_LAG_THRESHOLD', float, 0),
+            concurrent_updates=_parse_number(values, 'CONCURRENT_UPDATES', int, 1),
+            per_user_concurrency=_parse_number(values, 'PER_USER_CONCURRENCY', int, 1),
+            ping_concurrency=_parse_number(values, 'PING_CONCURRENCY', int, 1),
+            ssh_command=tuple(shlex.split(values['SSH_COMMAND'])),
+            ssh_user=values.get('SSH_USER') or None,
+            ssh_control_dir=values.get('SSH_CONTROL_DIR') or None,
+            ssh_max_parallel=_parse_number(values, 'SSH_MAX_PARALLEL', int, 1),
+            ssh_control_persist=_parse_number(values, 'SSH_CONTROL_PERSIST', int, 0),
+            ssh_timeout=_parse_number(values, 'SSH_TIMEOUT', float, 0, exclusive=True),
+            sleep_command=values['SLEEP_COMMAND'],
+            shutdown_command=values['SHUTDOWN_COMMAND'],
+            offline_timeout=_parse_number(values, 'OFFLINE_TIMEOUT', float, 0)
+        )
+
+# Erst beim ersten Zugriff geladen, damit der Import keine Datei-Zugriffe auslöst
+_config = None
+_config_lock = threading.Lock()
+
+# Einstellungen, die nur beim Start übernommen werden
+RESTART_ONLY_SETTINGS = ('telegram_token', 'connect_timeout', 'read_timeout', 'write_timeout', 'pool_timeout',
+                         'connection_pool_size', 'telegram_base_url',
+                         'log_format', 'log_queue_size', 'neighbor_detection', 'drop_pending_updates',
+                         'loop_lag_threshold', 'concurrent_updates', 'per_user_concurrency')
+
+def get_config():
+    """Gibt die aktuelle Konfiguration zurück und lädt sie beim ersten Aufruf"""
+    config = _config
+    if config is None:
+        with _config_lock:
+            if _config is None:
+                _set_config(Config.from_env())
+            config = _config
+    return config
+
+def _set_config(config):
+    global _config
+    _config = config
+
+def reload_config(env_path=ENV_FILE):
+    """Lädt die Konfiguration neu und tauscht sie atomar aus.
+
+    Bei ungültigen Werten bleibt die bisherige Konfiguration aktiv.
+    """
+    try:
+        new_config = Config.from_env(env_path)
+    except ValueError as e:
+        logger.error("Ungültige Konfiguration in %s, behalte bisherige Werte: %s", env_path, e)
+        return get_config()
+
+    with _config_lock:
+        old_config = _config
+        _set_config(new_config)
+    # Interfaces können sich geändert haben
+    wol_targets.invalidate()
+
+    if _logging_pipeline is not None:
+        logging.getLogger().setLevel(new_config.log_level)
+
+    if old_config is not None:
+        for setting in RESTART_ONLY_SETTINGS:
+            if getattr(old_config, setting) != getattr(new_config, setting):
+                logger.warning("Änderung an %s wird erst nach einem Neustart wirksam", setting.upper())
+    logger.info("Konfiguration neu geladen")
+    logger.debug("Token verfügbar: %s", 'Ja' if new_config.telegram_token else 'Nein')
+    logger.debug("Erlaubte Benutzer: %s", new_config.allowed_users)
+    return new_config
+
+_logging_pipeline = None
+
+def setup_logging(config):
+    """Richtet das Queue-basierte Logging mit Hintergrund-Thread ein"""
+    global _logging_pipeline
+    if _logging_pipeline is not None:
+        _logging_pipeline.stop()
+    _logging_pipeline = LoggingPipeline(
+        level=config.log_level,
+        log_format=config.log_format,
+        queue_size=config.log_queue_size
+    )
+    _logging_pipeline.start()
+    return _logging_pipeline
+
+def shutdown_logging():
+    """Schreibt ausstehende Log-Einträge und beendet den Schreib-Thread"""
+    global _logging_pipeline
+    if _logging_pipeline is not None:
+        _logging_pipeline.stop()
+        _logging_pipeline = None
+
+def _env_mtime(env_path):
+    try:
+        return os.stat(env_path).st_mtime_ns
+    except OSError:
+        return None
+
+async def watch_config(env_path=ENV_FILE):
+    """Lädt die Konfiguration neu, sobald sich die .env-Datei ändert"""
+    last_mtime = _env_mtime(env_path)
+    while True:
+        await asyncio.sleep(get_config().config_watch_interval or 5)
+        if not get_config().config_watch_interval:
+            continue
+        mtime = _env_mtime(env_path)
+        if mtime != last_mtime:
+            last_mtime = mtime
+            logger.info("Änderung an %s erkannt", env_path)
+            reload_config(env_path)
+
+# Alte Modul-Konstanten bleiben lesbar, werden aber aus der aktuellen Konfiguration bedient
+_LEGACY_SETTINGS = {
+    'TELEGRAM_TOKEN': 'telegram_token',
+    'ALLOWED_USERS': 'allowed_users',
+    'COMPUTERS_FILE': 'computers_file',
+    'MAX_TRIES': 'max_tries',
+    'CHECK_INTERVAL': 'check_interval',
+    'CONNECT_TIMEOUT': 'connect_timeout',
+    'READ_TIMEOUT': 'read_timeout',
+    'WRITE_TIMEOUT': 'write_timeout',
+    'POOL_TIMEOUT': 'pool_timeout'
+}
+
+def __getattr__(name):
+    if name in _LEGACY_SETTINGS:
+        return getattr(get_config(), _LEGACY_SETTINGS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _sqlite_store():
+    """Gibt den SQLite-Speicher zurück, falls STORAGE_BACKEND=sqlite gesetzt ist"""
+    config = get_config()
+    if config.storage_backend != 'sqlite':
+        return None
+    return open_store(config.database_file)
 
 def save_computers(computers, file_path=None):
     """Speichert die Computer"""
-    if file_path is None:
-        file_path = os.getenv('COMPUTERS_FILE', 'computers.json')
-    with open(file_path, 'w') as f:
-        json.dump(computers, f, indent=2)
+    try:
+        if file_path is None:
+            store = _sqlite_store()
+            if store is not None:
+                store.save_all(computers)
+                return
+            file_path = get_config().computers_file
+        with open(file_path, 'w') as f:
+            json.dump(computers, f, indent=2)
+    finally:
+        invalidate_inventory()
 
 def load_computers(file_path=None):
     """Lädt die gespeicherten Computer mit verbesserter Fehlerbehandlung"""
     if file_path is None:
-        file_path = os.getenv('COMPUTERS_FILE', 'computers.json')
+        store = _sqlite_store()
+        if store is not None:
+            try:
+                return store.load_all()
+            except sqlite3.Error as e:
+                logger.error("Error reading database %s: %s", store.path, e)
+                return {}
+        file_path = get_config().computers_file
     try:
         if not os.path.exists(file_path):
-            logger.warning(f"Computers file {file_path} not found. Creating empty file.")
+            logger.warning("Computers file %s not found. Creating empty file.", file_path)
             save_computers({}, file_path)
             return {}
             
@@ -116,93 +398,394 @@ def load_computers(file_path=None):
                     return {}
                 return data
             except json.JSONDecodeError as e:
-                logger.error(f"Error decoding JSON from {file_path}: {str(e)}")
+                logger.error("Error decoding JSON from %s: %s", file_path, e)
                 # Erstelle Backup der fehlerhaften Datei
                 backup_file = f"{file_path}.backup"
                 try:
                     os.rename(file_path, backup_file)
-                    logger.info(f"Created backup of corrupted file as {backup_file}")
+                    logger.info("Created backup of corrupted file as %s", backup_file)
                 except OSError as e:
-                    logger.error(f"Failed to create backup file: {str(e)}")
+                    logger.error("Failed to create backup file: %s", e)
                 return {}
     except OSError as e:
-        logger.error(f"Error accessing file {file_path}: {str(e)}")
+        logger.error("Error accessing file %s: %s", file_path, e)
+        return {}
+
+# SQLite-Zugriffe laufen in einem Thread: Hält ein anderer Prozess die Sperre,
+# wartet busy_timeout lang nur der Thread und nicht der ganze Event-Loop
+
+async def load_all_computers():
+    """Lädt alle gespeicherten Computer, bei Datenbankfehlern None"""
+    store = _sqlite_store()
+    if store is not None:
+        try:
+            return await asyncio.to_thread(store.load_all)
+        except sqlite3.Error as e:
+            logger.error("Error reading database %s: %s", store.path, e)
+            return None
+    return load_computers()
+
+# Geprüftes Inventar mit Schlüssel aus Speicherpfad und Änderungszeit; eigene
+# Schreibzugriffe verwerfen es sofort, fremde erkennt die Änderungszeit
+_inventory_cache = None
+
+def invalidate_inventory():
+    """Verwirft das zwischengespeicherte Inventar"""
+    global _inventory_cache
+    _inventory_cache = None
+
+def _file_version(path):
+    """Gibt Änderungszeit und Größe einer Datei zurück, None wenn sie fehlt"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _inventory_key():
+    """Bestimmt, welcher Stand des Speichers gerade gilt"""
+    config = get_config()
+    if config.storage_backend == 'sqlite':
+        # Im WAL-Modus landen Schreibzugriffe zuerst in der -wal Datei
+        path = config.database_file
+        return 'sqlite', path, _file_version(path), _file_version(f"{path}-wal")
+    path = config.computers_file
+    return 'json', path, _file_version(path)
+
+async def load_inventory():
+    """Lädt alle Computer als geprüfte Computer-Objekte; ungültige Einträge werden übersprungen"""
+    global _inventory_cache
+    key = _inventory_key()
+    if _inventory_cache is not None and _inventory_cache[0] == key:
+        return dict(_inventory_cache[1])
+    
+    computers = await load_all_computers()
+    if computers is None:
+        # Fehler nicht cachen, der nächste Aufruf versucht es erneut
         return {}
+    
+    inventory = {}
+    for name, data in computers.items():
+        try:
+            inventory[name] = Computer.from_dict(name, data)
+        except ValueError as e:
+            logger.error("Überspringe ungültigen Eintrag '%s': %s", name, e)
+    # Der Schlüssel wird vor dem Laden bestimmt, damit eine Änderung währenddessen neu lädt
+    _inventory_cache = (key, inventory)
+    return dict(inventory)
 
-def is_valid_mac(mac):
-    """Überprüft ob eine MAC-Adresse gültig ist"""
-    pattern = re.compile(r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$')
-    return bool(pattern.match(mac))
+async def get_computer(name):
+    """Gibt einen einzelnen Computer zurück oder None"""
+    store = _sqlite_store()
+    if store is not None:
+        try:
+            return await asyncio.to_thread(store.get, name)
+        except sqlite3.Error as e:
+            logger.error("Error reading database %s: %s", store.path, e)
+            return None
+    return load_computers().get(name)
 
-def is_valid_ip(ip):
-    """Überprüft ob eine IP-Adresse gültig ist"""
-    pattern = re.compile(r'^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$')
-    if not pattern.match(ip):
+async def store_computer(name, data):
+    """Fügt einen Computer hinzu oder aktualisiert ihn; gibt zurück, ob das Speichern geklappt hat"""
+    store = _sqlite_store()
+    if store is not None:
+        try:
+            await asyncio.to_thread(store.upsert, name, data)
+        except sqlite3.Error as e:
+            logger.error("Error writing database %s: %s", store.path, e)
+            return False
+        finally:
+            # Erst nach dem Schreiben, sonst cached ein paralleles Laden den alten Stand
+            invalidate_inventory()
+        return True
+    computers = load_computers()
+    computers[name] = data
+    save_computers(computers)
+    return True
+
+async def delete_computer(name):
+    """Entfernt einen Computer; gibt zurück, ob er vorhanden war, bei Datenbankfehlern None"""
+    store = _sqlite_store()
+    if store is not None:
+        try:
+            return await asyncio.to_thread(store.delete, name)
+        except sqlite3.Error as e:
+            logger.error("Error writing database %s: %s", store.path, e)
+            return None
+        finally:
+            invalidate_inventory()
+    computers = load_computers()
+    if name not in computers:
         return False
-    return all(0 <= int(part) <= 255 for part in ip.split('.'))
+    del computers[name]
+    save_computers(computers)
+    return True
 
 async def ping(ip):
     """Pingt eine IP-Adresse an"""
     param = '-n' if platform.system().lower() == 'windows' else '-c'
     command = ['ping', param, '1', ip]
     try:
-        return subprocess.call(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
+        # Als asynchroner Prozess, damit der Event-Loop während des Pings weiterläuft
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+        return await process.wait() == 0
     except:
         return False
 
-async def check_computer_status(context: ContextTypes.DEFAULT_TYPE, chat_id: int, name: str, ip: str, mac: str):
-    """Überprüft den Status eines Computers und sendet Wake-Signale wenn nötig"""
-    tries = 0
+_event_log = None
+
+def get_event_log():
+    """Gibt das Verlaufs-Log passend zur aktuellen Konfiguration zurück"""
+    global _event_log
+    config = get_config()
+    settings = (config.history_file, config.history_max_bytes, config.history_backups)
+    if _event_log is None or (_event_log.path, _event_log.max_bytes, _event_log.backups) != settings:
+        _event_log = EventLog(*settings)
+    return _event_log
+
+async def record_wake_event(name, mac, result, started, packets, tries):
+    """Schreibt einen abgeschlossenen Weckvorgang in den Verlauf"""
+    event = make_event(name, mac, result, time.time() - started, packets, tries)
+    try:
+        await asyncio.to_thread(get_event_log().append, event)
+    except OSError as e:
+        logger.error("Fehler beim Schreiben des Verlaufs: %s", e)
+
+_wake_journal = None
+
+def get_wake_journal():
+    """Gibt das Journal laufender Weckvorgänge passend zur Konfiguration zurück"""
+    global _wake_journal
+    path = get_config().wake_journal_file
+    if _wake_journal is None or _wake_journal.path != path:
+        _wake_journal = WakeJournal(path)
+    return _wake_journal
+
+async def checkpoint_wake_job(job):
+    """Sichert den Stand eines Weckvorgangs im Journal"""
+    try:
+        await asyncio.to_thread(get_wake_journal().checkpoint, job)
+    except OSError as e:
+        logger.error("Fehler beim Schreiben des Journals: %s", e)
+
+async def finish_wake_job(job):
+    """Entfernt einen abgeschlossenen Weckvorgang aus dem Journal"""
+    try:
+        await asyncio.to_thread(get_wake_journal().remove, job['id'])
+    except OSError as e:
+        logger.error("Fehler beim Schreiben des Journals: %s", e)
+
+# Broadcast-Adresse und Interface pro Netz, siehe netinfo.py
+wol_targets = WolTargetResolver()
+
+def send_wake_packet(mac, ip, broadcast=None, port=None):
+    """Sendet ein Wake-on-LAN Paket über das zum Computer passende Interface"""
+    target = wol_targets.resolve(ip, broadcast, port)
+    send_magic_packet(mac, ip_address=target.ip_address, port=target.port, interface=target.interface)
+
+# Wird in post_init gestartet, wenn NEIGHBOR_DETECTION aktiv ist
+neighbor_watcher = None
+
+async def wait_until_online(ip, mac, timeout):
+    """Wartet bis zu timeout Sekunden; endet früher, sobald der Kernel die MAC meldet und ein Ping antwortet"""
+    watcher = neighbor_watcher
+    if watcher is None:
+        await asyncio.sleep(timeout)
+        return False
     
-    # Erste Statusprüfung
-    if await ping(ip):
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=f"{EMOJI['CHECK']} Computer '{name}' ist bereits online!"
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    event = watcher.register(mac)
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+            event.clear()
+            if await ping(ip):
+                return True
+    finally:
+        watcher.unregister(mac, event)
+
+_ssh_pool = None
+
+def get_ssh_pool():
+    """Gibt den SSH-Pool passend zur aktuellen Konfiguration zurück"""
+    global _ssh_pool
+    config = get_config()
+    settings = (config.ssh_command, config.ssh_user, config.ssh_control_dir, config.ssh_control_persist,
+                config.ssh_max_parallel)
+    if _ssh_pool is None or (_ssh_pool.ssh_command, _ssh_pool.user, _ssh_pool.control_dir,
+                             _ssh_pool.control_persist, _ssh_pool.max_parallel) != settings:
+        if _ssh_pool is not None:
+            start_background_task(_ssh_pool.close())
+        _ssh_pool = SSHPool(
+            config.ssh_command,
+            user=config.ssh_user,
+            control_dir=config.ssh_control_dir,
+            control_persist=config.ssh_control_persist,
+            max_parallel=config.ssh_max_parallel
         )
-        return
+    return _ssh_pool
+
+async def wait_until_offline(ip, timeout):
+    """Pingt, bis der Computer nicht mehr antwortet; False, wenn er nach timeout noch online ist"""
+    deadline = time.monotonic() + timeout
+    while await ping(ip):
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(get_config().check_interval)
+    return True
+
+# Laufende Weckvorgänge nach Job-ID und die zugehörigen Tasks
+wake_jobs = {}
+_wake_tasks = set()
+
+def track_wake_task(coro):
+    """Startet einen Weckvorgang als Task, auf den beim Beenden gewartet wird"""
+    task = asyncio.create_task(coro)
+    _wake_tasks.add(task)
+    task.add_done_callback(_wake_tasks.discard)
+    return task
+
+async def check_computer_status(context: ContextTypes.DEFAULT_TYPE, chat_id: int, name: str, ip: str, mac: str,
+                                broadcast: str = None, port: int = None, job: dict = None):
+    """Überprüft den Status eines Computers und sendet Wake-Signale wenn nötig
+
+    Mit job wird ein aus dem Journal geladener Weckvorgang fortgesetzt.
+    """
+    if job is None:
+        job = {
+            'id': uuid.uuid4().hex[:8],
+            'chat_id': chat_id,
+            'name': name,
+            'ip': ip,
+            'mac': mac,
+            'broadcast': broadcast,
+            'port': port,
+            'tries': 0,
+            'packets': 0,
+            'started': time.time()
+        }
+    job_id_var.set(job['id'])
+    wake_jobs[job['id']] = job
     
-    # Computer ist offline, sende erstes Wake-Signal
+    keep_checkpoint = False
     try:
-        send_magic_packet(mac)
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=f"{EMOJI['MAIL']} Wake-on-LAN Paket wurde an '{name}' gesendet!"
-        )
+        await _run_wake_job(context, job)
+    except asyncio.CancelledError:
+        # Beim Herunterfahren bleibt der Stand im Journal und wird beim Start fortgesetzt
+        keep_checkpoint = True
+        logger.info("Weckvorgang für %s unterbrochen nach %d Versuchen", name, job['tries'])
+        raise
     except Exception as e:
-        logger.error(f"Fehler beim Senden des Wake-Pakets an {name}: {str(e)}")
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=f"{EMOJI['CROSS']} Fehler beim Senden des Wake-Pakets an '{name}': {str(e)}"
+        # Das Ergebnis des Tasks holt niemand ab; melden und den Eintrag verwerfen,
+        # sonst scheitert der Vorgang bei jedem Start erneut
+        logger.exception("Weckvorgang für %s nach %d Versuchen fehlgeschlagen", name, job['tries'])
+        await record_wake_event(name, mac, RESULT_ERROR, job['started'], job['packets'], job['tries'])
+        await send_job_message(
+            context,
+            job['chat_id'],
+            f"{EMOJI['CROSS']} Weckvorgang für '{name}' ist fehlgeschlagen: {e}"
         )
-        return
+    finally:
+        wake_jobs.pop(job['id'], None)
+        if not keep_checkpoint:
+            await finish_wake_job(job)
+
+async def send_job_message(context, chat_id, text):
+    """Sendet eine Statusmeldung eines Hintergrund-Vorgangs; Telegram-Fehler brechen den Vorgang nicht ab"""
+    try:
+        await context.bot.send_message(chat_id=chat_id, text=text)
+    except TelegramError as e:
+        logger.warning("Statusmeldung an Chat %s konnte nicht gesendet werden: %s", chat_id, e)
+
+async def _run_wake_job(context, job):
+    config = get_config()
+    chat_id, name, ip, mac = job['chat_id'], job['name'], job['ip'], job['mac']
+    broadcast, port = job.get('broadcast'), job.get('port')
     
-    # Warte und prüfe wiederholt den Status
-    while tries < MAX_TRIES:
-        await asyncio.sleep(CHECK_INTERVAL)
-        tries += 1
+    if job['packets'] == 0:
+        logger.info("Starte Weckvorgang für %s (%s)", name, mac)
         
+        # Erste Statusprüfung
         if await ping(ip):
-            await context.bot.send_message(
-                chat_id=chat_id,
-                text=f"{EMOJI['CHECK']} Computer '{name}' ist jetzt online!"
+            await record_wake_event(name, mac, RESULT_ALREADY_ONLINE, job['started'], job['packets'], job['tries'])
+            await send_job_message(
+                context,
+                chat_id,
+                f"{EMOJI['CHECK']} Computer '{name}' ist bereits online!"
+            )
+            return
+        
+        # Computer ist offline, sende erstes Wake-Signal
+        try:
+            send_wake_packet(mac, ip, broadcast, port)
+            job['packets'] += 1
+            await checkpoint_wake_job(job)
+            await send_job_message(
+                context,
+                chat_id,
+                f"{EMOJI['MAIL']} Wake-on-LAN Paket wurde an '{name}' gesendet!"
+            )
+        except Exception as e:
+            logger.error("Fehler beim Senden des Wake-Pakets an %s: %s", name, e)
+            await record_wake_event(name, mac, RESULT_ERROR, job['started'], job['packets'], job['tries'])
+            await send_job_message(
+                context,
+                chat_id,
+                f"{EMOJI['CROSS']} Fehler beim Senden des Wake-Pakets an '{name}': {str(e)}"
+            )
+            return
+    else:
+        logger.info("Setze Weckvorgang für %s nach %d Versuchen fort", name, job['tries'])
+        await send_job_message(
+            context,
+            chat_id,
+            f"{EMOJI['MAGNIFIER']} Weckvorgang für '{name}' wird nach Neustart fortgesetzt (Versuch {job['tries']}/{config.max_tries})"
+        )
+    
+    # Warte und prüfe wiederholt den Status
+    while job['tries'] < config.max_tries:
+        online = await wait_until_online(ip, mac, config.check_interval)
+        job['tries'] += 1
+        tries = job['tries']
+        
+        if online or await ping(ip):
+            await record_wake_event(name, mac, RESULT_ONLINE, job['started'], job['packets'], tries)
+            await send_job_message(
+                context,
+                chat_id,
+                f"{EMOJI['CHECK']} Computer '{name}' ist jetzt online!"
             )
             return
             
         # Sende alle 3 Versuche ein neues Wake-Signal
         if tries % 3 == 0:
             try:
-                send_magic_packet(mac)
-                await context.bot.send_message(
-                    chat_id=chat_id,
-                    text=f"{EMOJI['MAIL']} Sende erneutes Wake-on-LAN Paket an '{name}' (Versuch {tries}/{MAX_TRIES})"
+                send_wake_packet(mac, ip, broadcast, port)
+                job['packets'] += 1
+                await send_job_message(
+                    context,
+                    chat_id,
+                    f"{EMOJI['MAIL']} Sende erneutes Wake-on-LAN Paket an '{name}' (Versuch {tries}/{config.max_tries})"
                 )
             except Exception as e:
-                logger.error(f"Fehler beim Senden des Wake-Pakets an {name}: {str(e)}")
+                logger.error("Fehler beim Senden des Wake-Pakets an %s: %s", name, e)
+        
+        await checkpoint_wake_job(job)
     
-    await context.bot.send_message(
-        chat_id=chat_id,
-        text=f"{EMOJI['WARNING']} Computer '{name}' konnte nicht aufgeweckt werden nach {MAX_TRIES} Versuchen!"
+    await record_wake_event(name, mac, RESULT_TIMEOUT, job['started'], job['packets'], job['tries'])
+    await send_job_message(
+        context,
+        chat_id,
+        f"{EMOJI['WARNING']} Computer '{name}' konnte nicht aufgeweckt werden nach {config.max_tries} Versuchen!"
     )
 
 async def check_permission(update: Update):
@@ -211,13 +794,56 @@ async def check_permission(update: Update):
         return False
         
     user_id = update.effective_user.id
-    if user_id not in ALLOWED_USERS:
-        logger.warning(f"Unbefugter Zugriffsversuch von User ID: {user_id}")
+    if user_id not in get_config().allowed_users:
+        logger.warning("Unbefugter Zugriffsversuch von User ID: %s", user_id)
         if update.message:
             await update.message.reply_text(f"{EMOJI['CROSS']} Sorry, du bist nicht berechtigt diesen Bot zu nutzen.")
         return False
     return True
 
+async def reject_update(update):
+    """Antwortet auf ein Update, das wegen zu vieler laufender Anfragen abgewiesen wurde"""
+    # Unbefugten wird nicht geantwortet, damit Spam keine Antworten erzeugt
+    if not isinstance(update, Update) or update.effective_user.id not in get_config().allowed_users:
+        return
+    if update.effective_message:
+        await update.effective_message.reply_text(
+            f"{EMOJI['HOURGLASS']} Zu viele Anfragen gleichzeitig, bitte warte kurz und versuche es erneut."
+        )
+
+# Teure Befehle, die pro Benutzer gerade laufen: (Befehl, User ID)
+_running_commands = set()
+
+def single_flight(command):
+    """Lässt einen teuren Befehl pro Benutzer und Chat nur einmal gleichzeitig laufen
+
+    Ein erneuter Aufruf während der erste noch läuft, wird nicht erneut
+    ausgeführt; der Benutzer bekommt das Ergebnis des laufenden Aufrufs im
+    selben Chat. Die Berechtigung wird vorher geprüft, damit Unbefugte die
+    normale Ablehnung bekommen.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            if not await check_permission(update): return
+            
+            chat = update.effective_chat
+            key = (command, update_user_id(update), chat.id if chat else None)
+            if key in _running_commands:
+                logger.info("/%s von User ID %s in Chat %s läuft bereits, Aufruf wird zusammengefasst", *key)
+                if update.message:
+                    await update.message.reply_text(
+                        f"{EMOJI['HOURGLASS']} /{command} läuft bereits, das Ergebnis kommt gleich."
+                    )
+                return
+            _running_commands.add(key)
+            try:
+                return await handler(update, context)
+            finally:
+                _running_commands.discard(key)
+        return wrapper
+    return decorator
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Sendet eine Begrüßungsnachricht"""
     logger.debug("Start-Befehl empfangen")
@@ -235,11 +861,17 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Verfügbare Befehle:\n"
         "/wake [name] - Startet einen Computer\n"
         "/wakeall - Startet alle Computer\n"
+        "/sleep [name] - Versetzt einen Computer in den Ruhezustand\n"
+        "/sleepall - Versetzt alle Computer in den Ruhezustand\n"
+        "/shutdown [name] - Fährt einen Computer herunter\n"
+        "/shutdownall - Fährt alle Computer herunter\n"
         "/list - Zeigt alle Computer\n"
-        "/add [name] [mac] [ip] - Fügt einen Computer hinzu\n"
+        "/add [name] [mac] [ip] [broadcast] [port] - Fügt einen Computer hinzu\n"
         "/remove [name] - Entfernt einen Computer\n"
         "/status - Zeigt den Online-Status aller Computer\n"
-        "/scan - Zeigt alle Geräte im Netzwerk"
+        "/scan - Zeigt alle Geräte im Netzwerk\n"
+        "/history [name] - Zeigt Statistiken zu Weckvorgängen\n"
+        "/debug [profile] - Laufzeit-Informationen (nur Admins)"
     )
 
 async def add_computer(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -247,11 +879,11 @@ async def add_computer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not await check_permission(update): return
     
     args = context.args
-    if len(args) != 3:
-        await update.message.reply_text(f"{EMOJI['CROSS']} Bitte nutze: /add [name] [mac] [ip]")
+    if not 3 <= len(args) <= 5:
+        await update.message.reply_text(f"{EMOJI['CROSS']} Bitte nutze: /add [name] [mac] [ip] [broadcast] [port]")
         return
     
-    name, mac, ip = args
+    name, mac, ip = args[:3]
     if not is_valid_mac(mac):
         await update.message.reply_text(f"{EMOJI['CROSS']} Ungültige MAC-Adresse! Format: XX:XX:XX:XX:XX:XX")
         return
@@ -260,9 +892,22 @@ async def add_computer(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"{EMOJI['CROSS']} Ungültige IP-Adresse! Format: XXX.XXX.XXX.XXX")
         return
     
-    computers = load_computers()
-    computers[name] = {"mac": mac, "ip": ip}
-    save_computers(computers)
+    data = {"mac": mac, "ip": ip}
+    if len(args) >= 4:
+        if not is_valid_ip(args[3]):
+            await update.message.reply_text(f"{EMOJI['CROSS']} Ungültige Broadcast-Adresse! Format: XXX.XXX.XXX.XXX")
+            return
+        data["broadcast"] = args[3]
+    if len(args) == 5:
+        if not args[4].isdigit() or not 0 < int(args[4]) < 65536:
+            await update.message.reply_text(f"{EMOJI['CROSS']} Ungültiger Port! Erlaubt: 1-65535")
+            return
+        data["port"] = int(args[4])
+    
+    # Einheitliche Schreibweise speichern, egal welches Trennzeichen genutzt wurde
+    if not await store_computer(name, Computer.from_dict(name, data).to_dict()):
+        await update.message.reply_text(f"{EMOJI['CROSS']} Fehler beim Speichern von '{name}'!")
+        return
     
     await update.message.reply_text(f"{EMOJI['CHECK']} Computer '{name}' wurde hinzugefügt!")
 
@@ -275,11 +920,11 @@ async def remove_computer(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     name = context.args[0]
-    computers = load_computers()
     
-    if name in computers:
-        del computers[name]
-        save_computers(computers)
+    removed = await delete_computer(name)
+    if removed is None:
+        await update.message.reply_text(f"{EMOJI['CROSS']} Fehler beim Entfernen von '{name}'!")
+    elif removed:
         await update.message.reply_text(f"{EMOJI['CHECK']} Computer '{name}' wurde entfernt!")
     else:
         await update.message.reply_text(f"{EMOJI['CROSS']} Computer '{name}' nicht gefunden!")
@@ -288,14 +933,14 @@ async def list_computers(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Listet alle Computer auf"""
     if not await check_permission(update): return
     
-    computers = load_computers()
+    computers = await load_inventory()
     if not computers:
         await update.message.reply_text("Keine Computer gespeichert!")
         return
     
     message = f"{EMOJI['COMPUTER']} Gespeicherte Computer:\n\n"
-    for name, data in computers.items():
-        message += f"• {name}: {data['mac']} (IP: {data['ip']})\n"
+    for name, computer in computers.items():
+        message += f"• {name}: {computer.mac_str} (IP: {computer.ip})\n"
     
     await update.message.reply_text(message)
 
@@ -307,9 +952,21 @@ async def send_multiple_magic_packets(mac_address, retries=3, interval=1):
             if i < retries - 1:  # Warte nicht nach dem letzten Versuch
                 await asyncio.sleep(interval)
         except Exception as e:
-            logger.error(f"Fehler beim Senden des Wake-Pakets (Versuch {i+1}): {str(e)}")
+            logger.error("Fehler beim Senden des Wake-Pakets (Versuch %d): %s", i + 1, e)
             raise e
 
+def start_wake_job(context, chat_id, computer):
+    """Startet die Status-Überprüfung und den Wake-Prozess für einen Computer"""
+    return track_wake_task(check_computer_status(
+        context,
+        chat_id,
+        computer.name,
+        str(computer.ip),
+        computer.mac_str,
+        str(computer.broadcast) if computer.broadcast else None,
+        computer.port
+    ))
+
 async def wake(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Weckt einen Computer auf"""
     if not await check_permission(update): return
@@ -323,21 +980,21 @@ async def wake(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     name = context.args[0]
-    computers = load_computers()
+    data = await get_computer(name)
     
-    if name not in computers:
+    if data is None:
         await update.message.reply_text(f"{EMOJI['CROSS']} Computer '{name}' nicht gefunden!")
         return
     
-    # Starte Status-Überprüfung und Wake-Prozess
-    asyncio.create_task(check_computer_status(
-        context,
-        update.effective_chat.id,
-        name,
-        computers[name]["ip"],
-        computers[name]["mac"]
-    ))
+    try:
+        computer = Computer.from_dict(name, data)
+    except ValueError as e:
+        await update.message.reply_text(f"{EMOJI['CROSS']} Eintrag für '{name}' ist ungültig: {e}")
+        return
+    
+    start_wake_job(context, update.effective_chat.id, computer)
 
+@single_flight('wakeall')
 async def wakeall(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Weckt alle Computer auf"""
     if not await check_permission(update): return
@@ -346,42 +1003,86 @@ async def wakeall(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error("Update oder Message-Objekt ist None")
         return
     
-    computers = load_computers()
+    computers = await load_inventory()
     if not computers:
         await update.message.reply_text(f"{EMOJI['CROSS']} Keine Computer gespeichert!")
         return
     
-    await update.message.reply_text(f"{EMOJI['MAGNIFIER']} Starte Wake-Prozess für alle Computer...")
+    # Computer mit laufendem Weckvorgang (z.B. vom letzten /wakeall) nicht erneut wecken
+    running = {job['name'] for job in wake_jobs.values()}
+    pending = [computer for name, computer in computers.items() if name not in running]
+    
+    message = f"{EMOJI['MAGNIFIER']} Starte Wake-Prozess für alle Computer..."
+    skipped = len(computers) - len(pending)
+    if skipped:
+        message += f"\n{EMOJI['HOURGLASS']} {skipped} Computer werden bereits geweckt und übersprungen."
+    await update.message.reply_text(message)
     
     # Starte Status-Überprüfung für jeden Computer
-    for name, data in computers.items():
-        asyncio.create_task(check_computer_status(
-            context,
-            update.effective_chat.id,
-            name,
-            data["ip"],
-            data["mac"]
-        ))
+    for computer in pending:
+        start_wake_job(context, update.effective_chat.id, computer)
 
+@single_flight('status')
 async def check_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Zeigt den Status aller Computer an"""
     if not await check_permission(update): return
     
-    computers = load_computers()
+    computers = await load_inventory()
     if not computers:
         await update.message.reply_text("Keine Computer gespeichert!")
         return
     
     status_message = await update.message.reply_text(f"{EMOJI['MAGNIFIER']} Überprüfe Computer-Status...")
     
+    # Computer parallel anpingen, aber nie mehr Prozesse als PING_CONCURRENCY gleichzeitig starten
+    limit = asyncio.Semaphore(get_config().ping_concurrency)
+    
+    async def limited_ping(ip):
+        async with limit:
+            return await ping(ip)
+    
+    results = await asyncio.gather(*(limited_ping(str(computer.ip)) for computer in computers.values()))
+    
     message = f"{EMOJI['COMPUTER']} Computer Status:\n\n"
-    for name, data in computers.items():
-        is_online = await ping(data['ip'])
+    for name, is_online in zip(computers, results):
         status = f"{EMOJI['GREEN_CIRCLE']} Online" if is_online else f"{EMOJI['RED_CIRCLE']} Offline"
         message += f"• {name}: {status}\n"
     
     await status_message.edit_text(message)
 
+def _read_arp_table():
+    """Liest die ARP-Tabelle des Systems; blockiert, daher nur in einem Thread aufrufen"""
+    # Bestimme das richtige Kommando je nach Betriebssystem
+    if platform.system().lower() == 'windows':
+        command = 'arp -a'
+        shell = True
+    else:
+        # Versuche verschiedene Pfade für arp auf Unix-Systemen
+        arp_paths = ['/usr/sbin/arp', '/sbin/arp', 'arp']
+        command = None
+        for path in arp_paths:
+            try:
+                subprocess.check_output([path, '-n'], stderr=subprocess.DEVNULL)
+                command = [path, '-n']  # -n verhindert DNS-Lookups für schnellere Ergebnisse
+                shell = False
+                break
+            except (subprocess.SubprocessError, FileNotFoundError):
+                continue
+        
+        if command is None:
+            raise FileNotFoundError("Konnte den arp-Befehl nicht finden")
+    
+    # Führe das Kommando aus
+    return subprocess.check_output(command, shell=shell).decode('utf-8', errors='ignore')
+
+def _lookup_hostname(ip):
+    """Ermittelt den Hostnamen einer IP; blockiert, daher nur in einem Thread aufrufen"""
+    try:
+        return socket.gethostbyaddr(ip)[0]
+    except:
+        return "Unbekannt"
+
+@single_flight('scan')
 async def scan_network(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Scannt das Netzwerk nach aktiven Geräten"""
     if not await check_permission(update): return
@@ -390,32 +1091,10 @@ async def scan_network(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         # Lade gespeicherte Computer für Vergleich
-        saved_computers = load_computers()
-        saved_macs = {data['mac'].lower() for data in saved_computers.values()}
-        saved_ips = {data['ip'] for data in saved_computers.values()}
-        
-        # Bestimme das richtige Kommando je nach Betriebssystem
-        if platform.system().lower() == 'windows':
-            command = 'arp -a'
-            shell = True
-        else:
-            # Versuche verschiedene Pfade für arp auf Unix-Systemen
-            arp_paths = ['/usr/sbin/arp', '/sbin/arp', 'arp']
-            command = None
-            for path in arp_paths:
-                try:
-                    subprocess.check_output([path, '-n'], stderr=subprocess.DEVNULL)
-                    command = [path, '-n']  # -n verhindert DNS-Lookups für schnellere Ergebnisse
-                    shell = False
-                    break
-                except (subprocess.SubprocessError, FileNotFoundError):
-                    continue
-            
-            if command is None:
-                raise FileNotFoundError("Konnte den arp-Befehl nicht finden")
+        saved_names = {computer.mac: name for name, computer in (await load_inventory()).items()}
         
-        # Führe das Kommando aus
-        output = subprocess.check_output(command, shell=shell).decode('utf-8', errors='ignore')
+        # arp und DNS blockieren, daher außerhalb des Event-Loops
+        output = await asyncio.to_thread(_read_arp_table)
         
         # Parse die Ausgabe
         devices = []
@@ -448,23 +1127,13 @@ async def scan_network(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await status_message.edit_text(f"{EMOJI['CROSS']} Keine Geräte gefunden!")
             return
             
+        hostnames = await asyncio.gather(*(asyncio.to_thread(_lookup_hostname, device['ip']) for device in devices))
+        
         message = f"{EMOJI['COMPUTER']} Gefundene Geräte im Netzwerk:\n\n"
-        for device in devices:
+        for device, hostname in zip(devices, hostnames):
             # Prüfe ob das Gerät bereits gespeichert ist
-            is_saved = device['mac'].lower() in saved_macs
-            saved_name = None
-            if is_saved:
-                # Finde den Namen des gespeicherten Computers
-                for name, data in saved_computers.items():
-                    if data['mac'].lower() == device['mac'].lower():
-                        saved_name = name
-                        break
-            
-            # Versuche den Hostnamen zu ermitteln
-            try:
-                hostname = socket.gethostbyaddr(device['ip'])[0]
-            except:
-                hostname = "Unbekannt"
+            saved_name = saved_names.get(parse_mac(device['mac']))
+            is_saved = saved_name is not None
             
             # Füge Status-Emoji hinzu
             status_emoji = f"{EMOJI['FLOPPY']} " if is_saved else f"{EMOJI['MEMO']} "
@@ -486,27 +1155,374 @@ async def scan_network(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await status_message.edit_text(message)
         
     except Exception as e:
-        logger.error(f"Fehler beim Netzwerk-Scan: {str(e)}")
+        logger.error("Fehler beim Netzwerk-Scan: %s", e)
         await status_message.edit_text(f"{EMOJI['CROSS']} Fehler beim Scannen des Netzwerks: {str(e)}")
 
+# Aktionen für /sleep und /shutdown: Bezeichnung und Einstellung mit dem Befehl
+POWER_ACTIONS = {
+    'sleep': ('Ruhezustand', 'sleep_command'),
+    'shutdown': ('Herunterfahren', 'shutdown_command')
+}
+
+# Computer, für die gerade /sleep oder /shutdown läuft, und die zugehörigen Tasks
+power_jobs = {}
+_power_tasks = set()
+
+def track_power_task(coro):
+    """Startet /sleep oder /shutdown als Task, auf den beim Beenden gewartet wird"""
+    task = asyncio.create_task(coro)
+    _power_tasks.add(task)
+    task.add_done_callback(_power_tasks.discard)
+    return task
+
+async def power_off_computer(context: ContextTypes.DEFAULT_TYPE, chat_id: int, computer: Computer, action: str):
+    """Führt den Befehl für action per SSH aus und wartet, bis der Computer offline ist"""
+    config = get_config()
+    label, setting = POWER_ACTIONS[action]
+    name, ip = computer.name, str(computer.ip)
+    
+    if name in power_jobs:
+        await send_job_message(
+            context,
+            chat_id,
+            f"{EMOJI['HOURGLASS']} Für '{name}' läuft bereits: {POWER_ACTIONS[power_jobs[name]][0]}"
+        )
+        return
+    
+    power_jobs[name] = action
+    try:
+        if not await ping(ip):
+            await send_job_message(context, chat_id, f"{EMOJI['RED_CIRCLE']} Computer '{name}' ist bereits offline!")
+            return
+        
+        command = getattr(config, setting)
+        logger.info("%s für %s (%s): %s", label, name, ip, command)
+        try:
+            result = await get_ssh_pool().run(ip, command, timeout=config.ssh_timeout)
+        except asyncio.TimeoutError:
+            # Beim Einschlafen hängt die Sitzung oft, bis die Verbindung abbricht; entscheidend ist der Ping
+            logger.info("SSH-Befehl für %s nach %.0f s abgebrochen", name, config.ssh_timeout)
+            result = None
+        except OSError as e:
+            logger.error("SSH-Client konnte nicht gestartet werden: %s", e)
+            await send_job_message(context, chat_id, f"{EMOJI['CROSS']} SSH-Fehler: {e}")
+            return
+        
+        if result is not None and result.returncode not in (0, SSH_CONNECTION_ERROR):
+            logger.warning("%s für %s fehlgeschlagen (Exit-Code %d): %s", label, name, result.returncode, result.output)
+            await send_job_message(
+                context,
+                chat_id,
+                f"{EMOJI['CROSS']} {label} von '{name}' fehlgeschlagen (Exit-Code {result.returncode}):\n{result.output[-500:]}"
+            )
+            return
+        
+        if await wait_until_offline(ip, config.offline_timeout):
+            await send_job_message(context, chat_id, f"{EMOJI['CHECK']} Computer '{name}' ist offline ({label}).")
+            return
+        
+        message = f"{EMOJI['WARNING']} Computer '{name}' ist nach {config.offline_timeout:.0f} s noch online!"
+        if result is not None and result.output:
+            message += f"\nSSH: {result.output[-500:]}"
+        await send_job_message(context, chat_id, message)
+    finally:
+        power_jobs.pop(name, None)
+
+async def _power_command(update: Update, context: ContextTypes.DEFAULT_TYPE, action: str):
+    if not await check_permission(update): return
+    
+    if not update or not update.message:
+        logger.error("Update oder Message-Objekt ist None")
+        return
+    
+    if not context.args:
+        await update.message.reply_text(f"{EMOJI['CROSS']} Bitte nutze: /{action} [name]")
+        return
+    
+    name = context.args[0]
+    data = await get_computer(name)
+    if data is None:
+        await update.message.reply_text(f"{EMOJI['CROSS']} Computer '{name}' nicht gefunden!")
+        return
+    
+    try:
+        computer = Computer.from_dict(name, data)
+    except ValueError as e:
+        await update.message.reply_text(f"{EMOJI['CROSS']} Eintrag für '{name}' ist ungültig: {e}")
+        return
+    
+    await update.message.reply_text(f"{EMOJI['SLEEP']} {POWER_ACTIONS[action][0]} für '{name}' wird ausgeführt...")
+    track_power_task(power_off_computer(context, update.effective_chat.id, computer, action))
+
+async def _power_all_command(update: Update, context: ContextTypes.DEFAULT_TYPE, action: str):
+    if not await check_permission(update): return
+    
+    if not update or not update.message:
+        logger.error("Update oder Message-Objekt ist None")
+        return
+    
+    computers = await load_inventory()
+    if not computers:
+        await update.message.reply_text(f"{EMOJI['CROSS']} Keine Computer gespeichert!")
+        return
+    
+    await update.message.reply_text(
+        f"{EMOJI['SLEEP']} {POWER_ACTIONS[action][0]} für alle Computer wird ausgeführt..."
+    )
+    # Die Anzahl gleichzeitiger SSH-Verbindungen begrenzt der Pool
+    for computer in computers.values():
+        track_power_task(power_off_computer(context, update.effective_chat.id, computer, action))
+
+async def sleep_computer(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Versetzt einen Computer per SSH in den Ruhezustand"""
+    await _power_command(update, context, 'sleep')
+
+async def shutdown_computer(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Fährt einen Computer per SSH herunter"""
+    await _power_command(update, context, 'shutdown')
+
+@single_flight('sleepall')
+async def sleepall(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Versetzt alle Computer in den Ruhezustand"""
+    await _power_all_command(update, context, 'sleep')
+
+@single_flight('shutdownall')
+async def shutdownall(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Fährt alle Computer herunter"""
+    await _power_all_command(update, context, 'shutdown')
+
+# Hintergrund-Tasks, die mit dem Bot gestartet und beendet werden
+_background_tasks = set()
+
+def start_background_task(coro):
+    """Startet einen Hintergrund-Task, der beim Beenden des Bots abgebrochen wird"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+# Misst den Loop-Lag, gestartet in post_init
+loop_monitor = None
+
+async def post_init(application: Application):
+    """Richtet Konfigurations-Reload, Loop-Überwachung und Neighbor-Erkennung ein und setzt unterbrochene Weckvorgänge fort"""
+    global neighbor_watcher, loop_monitor
+    loop = asyncio.get_running_loop()
+    if hasattr(signal, 'SIGHUP'):
+        try:
+            loop.add_signal_handler(signal.SIGHUP, reload_config)
+        except (NotImplementedError, RuntimeError):
+            logger.warning("SIGHUP-Handler konnte nicht registriert werden")
+    start_background_task(watch_config())
+    
+    loop_monitor = LoopLagMonitor(threshold=get_config().loop_lag_threshold)
+    loop_monitor.start()
+    
+    if get_config().neighbor_detection:
+        watcher = NeighborWatcher()
+        try:
+            watcher.start(loop)
+            neighbor_watcher = watcher
+            logger.info("Neighbor-Erkennung über Netlink aktiv")
+        except (OSError, AttributeError, NotImplementedError) as e:
+            logger.warning("Neighbor-Erkennung nicht verfügbar, nutze nur Polling: %s", e)
+    
+    # Unterbrochene Weckvorgänge fortsetzen
+    jobs = await asyncio.to_thread(get_wake_journal().load)
+    for job in jobs.values():
+        track_wake_task(check_computer_status(
+            application,
+            job['chat_id'],
+            job['name'],
+            job['ip'],
+            job['mac'],
+            job.get('broadcast'),
+            job.get('port'),
+            job=job
+        ))
+    if jobs:
+        logger.info("%d unterbrochene Weckvorgänge werden fortgesetzt", len(jobs))
+
+async def post_stop(application: Application):
+    """Wartet bis SHUTDOWN_TIMEOUT auf laufende Weck- und Ausschaltvorgänge und bricht den Rest ab"""
+    wake_tasks = set(_wake_tasks)
+    tasks = wake_tasks | _power_tasks
+    if not tasks:
+        return
+    
+    timeout = get_config().shutdown_timeout
+    logger.info("Warte bis zu %.0f s auf %d laufende Vorgänge", timeout, len(tasks))
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    pending_wakes = len(pending & wake_tasks)
+    if pending_wakes:
+        logger.info("%d Weckvorgänge im Journal gesichert, sie werden beim nächsten Start fortgesetzt", pending_wakes)
+
+async def post_shutdown(application: Application):
+    """Beendet alle Hintergrund-Tasks und schließt die SSH-Verbindungen"""
+    global neighbor_watcher, loop_monitor, _ssh_pool
+    if neighbor_watcher is not None:
+        neighbor_watcher.stop()
+        neighbor_watcher = None
+    if loop_monitor is not None:
+        loop_monitor.stop()
+        loop_monitor = None
+    for task in list(_background_tasks):
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    if _ssh_pool is not None:
+        await _ssh_pool.close()
+        _ssh_pool = None
+
+def _format_ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:.1f} ms"
+
+# Maximale Länge einer Telegram-Nachricht
+MAX_MESSAGE_LENGTH = 4096
+MAX_PROFILE_SECONDS = 30
+
+async def debug_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Zeigt Laufzeit-Informationen, nur für ADMIN_USERS"""
+    if not await check_permission(update): return
+    
+    if update.effective_user.id not in get_config().admin_users:
+        logger.warning("Unbefugter /debug-Aufruf von User ID: %s", update.effective_user.id)
+        await update.message.reply_text(f"{EMOJI['CROSS']} /debug ist nur für Administratoren verfügbar.")
+        return
+    
+    if context.args and context.args[0] == 'profile':
+        await debug_profile(update, context)
+        return
+    
+    # Tasks nach Coroutine gruppieren
+    tasks = Counter(
+        getattr(task.get_coro(), '__qualname__', type(task.get_coro()).__name__)
+        for task in asyncio.all_tasks()
+    )
+    message = f"{EMOJI['MAGNIFIER']} Debug-Informationen\n\n"
+    message += f"Tasks ({sum(tasks.values())}):\n"
+    for coro_name, count in tasks.most_common():
+        message += f"• {coro_name}: {count}\n"
+    
+    message += f"\nLaufende Weckvorgänge ({len(wake_jobs)}):\n"
+    now = time.time()
+    for job in list(wake_jobs.values()):
+        message += f"• {job['name']} [{job['id']}]: Versuch {job['tries']}, {job['packets']} Pakete, seit {now - job['started']:.0f} s\n"
+    
+    if loop_monitor is not None:
+        lag = loop_monitor.summary()
+        message += f"\nLoop-Lag ({lag['samples']} Messungen): p50 {_format_ms(lag['p50'])}, "
+        message += f"p95 {_format_ms(lag['p95'])}, p99 {_format_ms(lag['p99'])}, max {_format_ms(lag['max'])}\n"
+        message += f"Blockaden über {loop_monitor.threshold * 1000:.0f} ms: {loop_monitor.stalls}\n"
+    
+    message += "\nWarteschlangen:\n"
+    message += f"• Updates: {context.application.update_queue.qsize()}\n"
+    processor = context.application.update_processor
+    if isinstance(processor, UserUpdateProcessor):
+        message += f"• In Arbeit: {processor.current_concurrent_updates}/{processor.max_concurrent_updates} "
+        message += f"(abgewiesen: {processor.rejected})\n"
+    if _logging_pipeline is not None:
+        message += f"• Log: {_logging_pipeline.depth} (verworfen: {_logging_pipeline.dropped})\n"
+    if neighbor_watcher is not None:
+        message += f"• Neighbor-Erkennung: {neighbor_watcher.pending} MACs\n"
+    
+    await update.message.reply_text(message[:MAX_MESSAGE_LENGTH])
+
+async def debug_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Sampelt den Event-Loop für ein festes Zeitfenster"""
+    try:
+        seconds = float(context.args[1]) if len(context.args) > 1 else 5.0
+    except ValueError:
+        seconds = None
+    # nan, inf und Werte <= 0 würden stillschweigend ein leeres Profil liefern
+    if seconds is None or not math.isfinite(seconds) or seconds <= 0:
+        await update.message.reply_text(f"{EMOJI['CROSS']} Bitte nutze: /debug profile [sekunden]")
+        return
+    seconds = min(seconds, MAX_PROFILE_SECONDS)
+    
+    status_message = await update.message.reply_text(f"{EMOJI['MAGNIFIER']} Profiling für {seconds:.0f} s...")
+    samples, own, cumulative = await asyncio.to_thread(sample_stacks, threading.get_ident(), seconds)
+    
+    message = f"{EMOJI['MAGNIFIER']} Profil des Event-Loops ({samples} Samples, {seconds:.0f} s)\n\n"
+    message += "Oberste Stack-Zeile:\n"
+    message += ''.join(f"{share:6.1%} {key}\n" for share, key in own)
+    message += "\nKumulativ:\n"
+    message += ''.join(f"{share:6.1%} {key}\n" for share, key in cumulative)
+    await status_message.edit_text(message[:MAX_MESSAGE_LENGTH])
+
+def _format_seconds(seconds):
+    return '-' if seconds is None else f"{seconds:.0f} s"
+
+async def show_history(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Zeigt Statistiken zu vergangenen Weckvorgängen"""
+    if not await check_permission(update): return
+    
+    name = context.args[0] if context.args else None
+    event_log = get_event_log()
+    # Auswertung im Thread, damit große Logs den Bot nicht blockieren
+    stats = await asyncio.to_thread(compute_stats, event_log, name)
+    
+    if not stats:
+        if name:
+            await update.message.reply_text(f"{EMOJI['CROSS']} Keine Weckvorgänge für '{name}' gefunden!")
+        else:
+            await update.message.reply_text("Noch keine Weckvorgänge aufgezeichnet!")
+        return
+    
+    message = f"{EMOJI['MEMO']} Weckvorgänge:\n\n"
+    for host_name in sorted(stats):
+        host = stats[host_name]
+        message += f"• {host_name}: {host.attempts} Weckvorgänge"
+        if host.results[RESULT_ALREADY_ONLINE]:
+            message += f", {host.results[RESULT_ALREADY_ONLINE]}x bereits online"
+        message += "\n"
+        if host.woken:
+            message += f"  Bootzeit p50: {_format_seconds(host.boot_times.percentile(50))}, "
+            message += f"p95: {_format_seconds(host.boot_times.percentile(95))}\n"
+            message += f"  Pakete im Schnitt: {host.average_packets:.1f}\n"
+        if host.failure_rate is not None:
+            message += f"  Fehlerquote: {host.failure_rate:.0%}\n"
+    
+    await update.message.reply_text(message)
+
 def main():
     """Startet den Bot"""
+    # Konfiguration laden und Logging einrichten, danach fehlende Standardwerte ergänzen
+    config = get_config()
+    setup_logging(config)
+    ensure_env_defaults()
+
     # Request-Parameter für bessere Timeout-Behandlung
     request = HTTPXRequest(
-        connect_timeout=CONNECT_TIMEOUT,
-        read_timeout=READ_TIMEOUT,
-        write_timeout=WRITE_TIMEOUT,
-        pool_timeout=POOL_TIMEOUT
+        connection_pool_size=config.connection_pool_size,
+        connect_timeout=config.connect_timeout,
+        read_timeout=config.read_timeout,
+        write_timeout=config.write_timeout,
+        pool_timeout=config.pool_timeout
+    )
+    
+    # Updates nebenläufig verarbeiten, global und pro Benutzer begrenzt
+    update_processor = UserUpdateProcessor(
+        config.concurrent_updates,
+        config.per_user_concurrency,
+        on_reject=reject_update
     )
     
     application = Application.builder()\
-        .token(TELEGRAM_TOKEN)\
+        .token(config.telegram_token)\
+        .base_url(config.telegram_base_url)\
         .request(request)\
+        .concurrent_updates(update_processor)\
+        .post_init(post_init)\
+        .post_stop(post_stop)\
+        .post_shutdown(post_shutdown)\
         .build()
 
     # Füge Error Handler hinzu
     async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
-        logger.error(f"Exception while handling an update: {context.error}")
+        logger.error("Exception while handling an update: %s", context.error)
         
         if isinstance(context.error, TimedOut):
             logger.info("Timeout aufgetreten - Versuche es erneut...")
@@ -529,11 +1545,20 @@ def main():
     application.add_handler(CommandHandler("list", list_computers))
     application.add_handler(CommandHandler("wake", wake))
     application.add_handler(CommandHandler("wakeall", wakeall))
+    application.add_handler(CommandHandler("sleep", sleep_computer))
+    application.add_handler(CommandHandler("sleepall", sleepall))
+    application.add_handler(CommandHandler("shutdown", shutdown_computer))
+    application.add_handler(CommandHandler("shutdownall", shutdownall))
     application.add_handler(CommandHandler("status", check_status))
     application.add_handler(CommandHandler("scan", scan_network))
+    application.add_handler(CommandHandler("history", show_history))
+    application.add_handler(CommandHandler("debug", debug_info))
     
     # Starte den Bot
-    application.run_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=True)
+    try:
+        application.run_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=config.drop_pending_updates)
+    finally:
+        shutdown_logging()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
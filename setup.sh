@@ -73,7 +73,7 @@ check_dependencies() {
         echo -e "${RED}Fehlende Abhängigkeiten: ${MISSING_DEPS[*]}${NC}"
         echo "Installiere fehlende Pakete..."
         sudo apt update
-        sudo apt install -y git python3-venv python3-pip iputils-ping
+        sudo apt install -y git python3-venv python3-pip iputils-ping openssh-client
     else
         echo -e "${GREEN}Alle Abhängigkeiten sind erfüllt.${NC}"
     fi
@@ -0,0 +1,177 @@
+"""SQLite-Speicher für die Computer-Liste
+
+Alternative zu computers.json für große Inventare und für den Zugriff aus
+mehreren Prozessen. Die Datenbank läuft im WAL-Modus, Name, MAC und IP sind
+indiziert. MAC und IP werden in kanonischer Schreibweise gespeichert und
+gesucht (AA:BB:CC:DD:EE:FF, ohne führende Nullen), damit die Suche über den
+Index unabhängig von Trennzeichen und Schreibweise trifft. Alle Abfragen
+nutzen feste SQL-Texte mit Parametern, sodass sqlite3 die vorbereiteten
+Statements pro Verbindung wiederverwendet.
+
+Einmalige Migration einer bestehenden JSON-Datei:
+    python sqlite_store.py computers.json computers.db
+"""
+import json
+import logging
+import sqlite3
+import sys
+import threading
+
+from models import format_mac, parse_ip, parse_mac
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS computers (
+    name TEXT PRIMARY KEY,
+    mac TEXT NOT NULL COLLATE NOCASE,
+    ip TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_computers_mac ON computers (mac);
+CREATE INDEX IF NOT EXISTS idx_computers_ip ON computers (ip);
+"""
+
+SELECT_ALL = "SELECT name, mac, ip, extra FROM computers ORDER BY rowid"
+SELECT_BY_NAME = "SELECT mac, ip, extra FROM computers WHERE name = ?"
+SELECT_BY_MAC = "SELECT name, mac, ip, extra FROM computers WHERE mac = ?"
+SELECT_BY_IP = "SELECT name, mac, ip, extra FROM computers WHERE ip = ?"
+SELECT_NAMES = "SELECT name FROM computers"
+UPSERT = (
+    "INSERT INTO computers (name, mac, ip, extra) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(name) DO UPDATE SET mac = excluded.mac, ip = excluded.ip, extra = excluded.extra"
+)
+DELETE = "DELETE FROM computers WHERE name = ?"
+
+
+def canonical_mac(mac):
+    """Kanonische Schreibweise einer MAC-Adresse; ungültige Werte bleiben unverändert"""
+    try:
+        return format_mac(parse_mac(mac))
+    except (TypeError, ValueError):
+        return mac
+
+
+def canonical_ip(ip):
+    """Kanonische Schreibweise einer IP-Adresse; ungültige Werte bleiben unverändert"""
+    try:
+        return str(parse_ip(ip))
+    except (TypeError, ValueError):
+        return ip
+
+
+def _to_row(name, data):
+    """Wandelt einen Eintrag aus computers.json in eine Tabellenzeile um"""
+    extra = {key: value for key, value in data.items() if key not in ('mac', 'ip')}
+    return name, canonical_mac(data['mac']), canonical_ip(data['ip']), json.dumps(extra) if extra else None
+
+
+def _to_dict(mac, ip, extra):
+    """Wandelt eine Tabellenzeile zurück in das JSON-Format"""
+    data = {'mac': mac, 'ip': ip}
+    if extra:
+        data.update(json.loads(extra))
+    return data
+
+
+class SQLiteStore:
+    """Computer-Liste in einer SQLite-Datenbank"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def load_all(self):
+        """Lädt alle Computer im Format von computers.json"""
+        with self._lock:
+            rows = self._conn.execute(SELECT_ALL).fetchall()
+        return {name: _to_dict(mac, ip, extra) for name, mac, ip, extra in rows}
+
+    def save_all(self, computers):
+        """Ersetzt den gesamten Bestand in einer Transaktion"""
+        with self._lock, self._conn:
+            existing = {row[0] for row in self._conn.execute(SELECT_NAMES)}
+            self._conn.executemany(UPSERT, (_to_row(name, data) for name, data in computers.items()))
+            self._conn.executemany(DELETE, ((name,) for name in existing - computers.keys()))
+
+    def get(self, name):
+        """Gibt einen Computer zurück oder None"""
+        with self._lock:
+            row = self._conn.execute(SELECT_BY_NAME, (name,)).fetchone()
+        return _to_dict(*row) if row else None
+
+    def find_by_mac(self, mac):
+        """Sucht Computer anhand der MAC-Adresse, unabhängig von Trennzeichen und Schreibweise"""
+        with self._lock:
+            rows = self._conn.execute(SELECT_BY_MAC, (canonical_mac(mac),)).fetchall()
+        return {name: _to_dict(mac, ip, extra) for name, mac, ip, extra in rows}
+
+    def find_by_ip(self, ip):
+        """Sucht Computer anhand der IP-Adresse"""
+        with self._lock:
+            rows = self._conn.execute(SELECT_BY_IP, (canonical_ip(ip),)).fetchall()
+        return {name: _to_dict(mac, ip, extra) for name, mac, ip, extra in rows}
+
+    def upsert(self, name, data):
+        """Fügt einen Computer hinzu oder aktualisiert ihn"""
+        with self._lock, self._conn:
+            self._conn.execute(UPSERT, _to_row(name, data))
+
+    def delete(self, name):
+        """Entfernt einen Computer; gibt zurück, ob er vorhanden war"""
+        with self._lock, self._conn:
+            return self._conn.execute(DELETE, (name,)).rowcount > 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Eine Verbindung pro Datenbankdatei und Prozess
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path):
+    """Gibt den (gecachten) Speicher für eine Datenbankdatei zurück"""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SQLiteStore(path)
+        return store
+
+
+def close_stores():
+    """Schließt alle offenen Datenbankverbindungen"""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
+
+
+def migrate_json(json_path, db_path):
+    """Überträgt alle Computer aus einer JSON-Datei in die Datenbank"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        computers = json.load(f)
+    if not isinstance(computers, dict):
+        raise ValueError(f"Ungültiges Format in {json_path}, erwartet wird ein Dictionary")
+
+    store = open_store(db_path)
+    with store._lock, store._conn:
+        store._conn.executemany(UPSERT, (_to_row(name, data) for name, data in computers.items()))
+    logger.info("%d Computer aus %s nach %s übertragen", len(computers), json_path, db_path)
+    return len(computers)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Nutzung: python sqlite_store.py [computers.json] [computers.db]")
+        sys.exit(1)
+    logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', level=logging.INFO)
+    migrate_json(sys.argv[1], sys.argv[2])
@@ -0,0 +1,70 @@
+"""Lokaler Ersatz für den OpenSSH-Client in Tests
+
+Versteht die Aufrufe von remote.SSHPool (-o Optionen, -O exit, Ziel,
+Befehl), führt aber nichts aus. Jeder Aufruf wird als JSON-Zeile in
+FAKE_SSH_LOG protokolliert. Das Multiplexing wird über Dateien am
+ControlPath nachgebildet: Existiert sie nicht, wird sie angelegt und der
+Aufruf als Master markiert; -O exit entfernt sie wieder.
+
+Weitere Umgebungsvariablen:
+    FAKE_SSH_EXIT    Exit-Code für Befehle (Standard 0)
+    FAKE_SSH_OUTPUT  Ausgabe des Befehls
+    FAKE_SSH_DELAY   Laufzeit eines Befehls in Sekunden
+"""
+import json
+import os
+import sys
+import time
+
+
+def parse_args(args):
+    options, control, rest = {}, None, []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if rest:
+            rest.append(arg)
+        elif arg == '-o':
+            key, _, value = args[i + 1].partition('=')
+            options[key] = value
+            i += 1
+        elif arg == '-O':
+            control = args[i + 1]
+            i += 1
+        elif not arg.startswith('-'):
+            rest.append(arg)
+        i += 1
+    target = rest[0] if rest else None
+    return options, control, target, ' '.join(rest[1:])
+
+
+def main():
+    options, control, target, command = parse_args(sys.argv[1:])
+    control_path = options.get('ControlPath', '').replace('%C', target.replace('@', '_'))
+    entry = {'target': target, 'command': command, 'control': control, 'master': False, 'start': time.time()}
+
+    exit_code = 0
+    if control == 'exit':
+        if control_path and os.path.exists(control_path):
+            os.remove(control_path)
+        else:
+            exit_code = 255
+    else:
+        if control_path and not os.path.exists(control_path):
+            with open(control_path, 'w'):
+                pass
+            entry['master'] = True
+        time.sleep(float(os.environ.get('FAKE_SSH_DELAY', '0')))
+        print(os.environ.get('FAKE_SSH_OUTPUT', ''), end='')
+        exit_code = int(os.environ.get('FAKE_SSH_EXIT', '0'))
+
+    entry['end'] = time.time()
+    log_path = os.environ.get('FAKE_SSH_LOG')
+    if log_path:
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, MagicMock, AsyncMock
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrency import UserUpdateProcessor
+import server
+
+def make_update(user_id):
+    update = MagicMock()
+    update.effective_user.id = user_id
+    update.effective_chat.id = user_id
+    update.message = AsyncMock()
+    return update
+
+class TestUserUpdateProcessor(unittest.IsolatedAsyncioTestCase):
+    async def test_per_user_limit(self):
+        """Test that one user cannot exceed the per-user limit while others still get through"""
+        rejected = []
+
+        async def on_reject(update):
+            rejected.append(update.effective_user.id)
+
+        processor = UserUpdateProcessor(4, 2, on_reject=on_reject)
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(user_id):
+            await release.wait()
+            handled.append(user_id)
+
+        tasks = [asyncio.create_task(processor.process_update(make_update(user_id), handler(user_id)))
+                 for user_id in (1, 1, 1, 2)]
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        self.assertEqual(rejected, [1])
+        self.assertEqual(processor.in_flight(1), 2)
+        self.assertEqual(processor.in_flight(2), 1)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(sorted(handled), [1, 1, 2])
+        self.assertEqual(processor.in_flight(1), 0)
+        self.assertEqual(processor.rejected, 1)
+
+    async def test_flood_sends_one_notice(self):
+        """Test that a flood of rejected updates sends one notice and keeps global slots free"""
+        rejected = []
+
+        async def on_reject(update):
+            rejected.append(update.effective_user.id)
+
+        processor = UserUpdateProcessor(4, 1, on_reject=on_reject)
+        release = asyncio.Event()
+
+        async def handler():
+            await release.wait()
+
+        running = asyncio.create_task(processor.process_update(make_update(1), handler()))
+        await asyncio.sleep(0)
+        await asyncio.gather(*(processor.process_update(make_update(1), handler()) for _ in range(200)))
+
+        self.assertEqual(rejected, [1])
+        self.assertEqual(processor.rejected, 200)
+        self.assertEqual(processor.current_concurrent_updates, 1)
+
+        # Nach dem Ende des laufenden Updates gibt es wieder einen Hinweis
+        release.set()
+        await running
+        release.clear()
+        running = asyncio.create_task(processor.process_update(make_update(1), handler()))
+        await asyncio.sleep(0)
+        await processor.process_update(make_update(1), handler())
+        self.assertEqual(rejected, [1, 1])
+        release.set()
+        await running
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {'ALLOWED_USERS': '12345,67890'})
+        self.env.start()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+
+    def tearDown(self):
+        self.env.stop()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+        shutil.rmtree(self.test_dir)
+
+    async def test_repeated_command_is_coalesced(self):
+        """Test that an expensive command runs only once per user at a time"""
+        release = asyncio.Event()
+        calls = []
+
+        @server.single_flight('scan')
+        async def handler(update, context):
+            calls.append(update.effective_user.id)
+            await release.wait()
+
+        first = asyncio.create_task(handler(make_update(12345), MagicMock()))
+        await asyncio.sleep(0)
+
+        repeated = make_update(12345)
+        await handler(repeated, MagicMock())
+        self.assertIn("läuft bereits", repeated.message.reply_text.call_args.args[0])
+
+        # Andere Benutzer sind nicht betroffen
+        other = asyncio.create_task(handler(make_update(67890), MagicMock()))
+        await asyncio.sleep(0)
+        self.assertEqual(calls, [12345, 67890])
+
+        release.set()
+        await asyncio.gather(first, other)
+        await handler(make_update(12345), MagicMock())
+        self.assertEqual(calls, [12345, 67890, 12345])
+
+    async def test_unauthorized_and_other_chats(self):
+        """Test that unauthorized users get the rejection and other chats are not coalesced"""
+        release = asyncio.Event()
+        calls = []
+
+        @server.single_flight('scan')
+        async def handler(update, context):
+            calls.append(update.effective_chat.id)
+            await release.wait()
+
+        intruder = make_update(1)
+        await asyncio.gather(handler(intruder, MagicMock()), handler(intruder, MagicMock()))
+        self.assertEqual(calls, [])
+        for call in intruder.message.reply_text.call_args_list:
+            self.assertIn("nicht berechtigt", call.args[0])
+
+        first = asyncio.create_task(handler(make_update(12345), MagicMock()))
+        await asyncio.sleep(0)
+        group = make_update(12345)
+        group.effective_chat.id = -100
+        second = asyncio.create_task(handler(group, MagicMock()))
+        await asyncio.sleep(0)
+        self.assertEqual(calls, [12345, -100])
+        release.set()
+        await asyncio.gather(first, second)
+
+    def test_concurrency_limits_must_be_positive(self):
+        """Test that zero limits are rejected instead of hanging /status or /sleep"""
+        for key in ('PING_CONCURRENCY', 'SSH_MAX_PARALLEL', 'CONCURRENT_UPDATES', 'PER_USER_CONCURRENCY'):
+            with patch.dict(os.environ, {key: '0'}):
+                with self.assertRaises(ValueError):
+                    server.Config.from_env(os.path.join(self.test_dir, ".env"))
+
+    async def test_permission_uses_frozenset(self):
+        """Test that allowed users are stored in a constant-time lookup structure"""
+        self.assertIsInstance(server.get_config().allowed_users, frozenset)
+        self.assertTrue(await server.check_permission(make_update(67890)))
+        self.assertFalse(await server.check_permission(make_update(1)))
+
+class TestStatusPings(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {
+            'COMPUTERS_FILE': os.path.join(self.test_dir, "computers.json"),
+            'PING_CONCURRENCY': '3',
+            'ALLOWED_USERS': '12345'
+        })
+        self.env.start()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+        server.save_computers({
+            f"pc{i}": {'mac': f"00:11:22:33:44:{i:02x}", 'ip': f"192.168.1.{i + 1}"} for i in range(20)
+        })
+
+    def tearDown(self):
+        self.env.stop()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+        shutil.rmtree(self.test_dir)
+
+    async def test_pings_are_bounded(self):
+        """Test that /status never runs more than PING_CONCURRENCY pings at once"""
+        running = 0
+        peak = 0
+
+        async def fake_ping(ip):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            return ip.endswith('.1')
+
+        update = make_update(12345)
+        with patch('server.ping', side_effect=fake_ping):
+            await server.check_status(update, MagicMock())
+
+        self.assertEqual(peak, 3)
+        status_message = update.message.reply_text.return_value
+        text = status_message.edit_text.call_args.args[0]
+        self.assertEqual(text.count("Offline"), 19)
+        self.assertIn("pc0: 🟢 Online", text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, MagicMock, AsyncMock
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import EventLog, Histogram, compute_stats, make_event, RESULT_ONLINE, RESULT_TIMEOUT
+import server
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.test_dir, "history.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_rotation_keeps_order(self):
+        """Test size-based rotation and chronological iteration across files"""
+        log = EventLog(self.log_file, max_bytes=200, backups=2)
+        for i in range(20):
+            log.append({'name': 'pc1', 'i': i})
+
+        self.assertEqual(len(log.files()), 3)
+        self.assertFalse(os.path.exists(self.log_file + ".3"))
+        numbers = [event['i'] for event in log]
+        self.assertEqual(numbers, sorted(numbers))
+        self.assertEqual(numbers[-1], 19)
+        self.assertLessEqual(os.path.getsize(self.log_file), 200)
+
+    def test_skips_malformed_lines(self):
+        """Test that broken and non-object lines are skipped instead of breaking the stats"""
+        log = EventLog(self.log_file, max_bytes=10000, backups=1)
+        log.append(make_event('pc1', 'aa', RESULT_ONLINE, 30, 1, 2))
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write('{kaputt\n[]\n42\n"text"\nnull\n')
+        log.append(make_event('pc1', 'aa', RESULT_ONLINE, 40, 1, 2))
+
+        with self.assertLogs('history', 'WARNING') as logs:
+            events = list(log)
+        self.assertEqual(len(events), 2)
+        self.assertEqual(len(logs.records), 5)
+        self.assertEqual(compute_stats(log)['pc1'].attempts, 2)
+
+    def test_compute_stats(self):
+        """Test percentiles, packets and failure rate per host"""
+        events = [make_event('pc1', 'aa', RESULT_ONLINE, seconds, 2, 3) for seconds in range(10, 110, 10)]
+        events.append(make_event('pc1', 'aa', RESULT_TIMEOUT, 300, 10, 30))
+        events.append(make_event('pc2', 'bb', RESULT_ONLINE, 20, 1, 2))
+
+        stats = compute_stats(events)
+        pc1 = stats['pc1']
+        self.assertEqual(pc1.attempts, 11)
+        self.assertAlmostEqual(pc1.failure_rate, 1 / 11)
+        self.assertAlmostEqual(pc1.average_packets, 2)
+        # Logarithmische Buckets: höchstens 5 % Abweichung nach oben
+        self.assertTrue(50 <= pc1.boot_times.percentile(50) <= 50 * Histogram.GROWTH)
+        self.assertTrue(100 <= pc1.boot_times.percentile(95) <= 100 * Histogram.GROWTH)
+
+        self.assertEqual(list(compute_stats(events, 'pc2')), ['pc2'])
+
+class TestWakeHistory(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {
+            'HISTORY_FILE': os.path.join(self.test_dir, "history.log"),
+            'WAKE_JOURNAL_FILE': os.path.join(self.test_dir, "wake_jobs.json"),
+            'MAX_TRIES': '3',
+            'CHECK_INTERVAL': '0',
+            'ALLOWED_USERS': '12345'
+        })
+        self.env.start()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+
+    def tearDown(self):
+        self.env.stop()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+        shutil.rmtree(self.test_dir)
+
+    @patch('server.send_magic_packet')
+    @patch('server.ping')
+    async def test_wake_is_recorded(self, mock_ping, mock_send_magic_packet):
+        """Test that finished wake jobs are written to the history and reported"""
+        mock_ping.side_effect = [False, False, True, False, False, False, False]
+        context = MagicMock()
+        context.bot = AsyncMock()
+
+        await server.check_computer_status(context, 1, 'pc1', '192.168.1.100', '00:11:22:33:44:55')
+        await server.check_computer_status(context, 1, 'pc2', '192.168.1.101', 'AA:BB:CC:DD:EE:FF')
+
+        events = list(server.get_event_log())
+        self.assertEqual([(e['name'], e['result'], e['packets']) for e in events],
+                         [('pc1', 'online', 1), ('pc2', 'timeout', 2)])
+
+        update = MagicMock()
+        update.effective_user.id = 12345
+        update.message = AsyncMock()
+        context.args = ['pc2']
+        await server.show_history(update, context)
+
+        reply = update.message.reply_text.call_args.args[0]
+        self.assertIn("pc2: 1 Weckvorgänge", reply)
+        self.assertIn("Fehlerquote: 100%", reply)
+        self.assertNotIn("pc1", reply)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import asyncio
+import io
+import json
+import logging
+import os
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logging_setup import LoggingPipeline, job_id_var
+
+class TestLoggingPipeline(unittest.TestCase):
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved_handlers = list(self.root.handlers)
+        self.saved_level = self.root.level
+        self.stream = io.StringIO()
+
+    def tearDown(self):
+        for handler in list(self.root.handlers):
+            self.root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(self.saved_level)
+
+    def test_json_output_with_job_id(self):
+        """Test structured output and per-task correlation IDs"""
+        pipeline = LoggingPipeline(log_format='json', stream=self.stream)
+        pipeline.start()
+
+        async def job(job_id):
+            job_id_var.set(job_id)
+            logging.getLogger('test').info("Weckvorgang %s", job_id)
+
+        async def run_jobs():
+            await asyncio.gather(job('a1'), job('b2'))
+            logging.getLogger('test').info("ohne Job")
+
+        asyncio.run(run_jobs())
+        pipeline.stop()
+
+        entries = [json.loads(line) for line in self.stream.getvalue().splitlines()]
+        self.assertEqual({(e['job_id'], e['message']) for e in entries},
+                         {('a1', 'Weckvorgang a1'), ('b2', 'Weckvorgang b2'), ('-', 'ohne Job')})
+
+    def test_exceptions_and_lazy_arguments(self):
+        """Test that disabled levels are skipped and tracebacks are written by the listener"""
+        pipeline = LoggingPipeline(stream=self.stream)
+        pipeline.start()
+
+        class Expensive:
+            formatted = False
+            def __str__(self):
+                Expensive.formatted = True
+                return "teuer"
+
+        logging.getLogger('test').debug("Debug %s", Expensive())
+        try:
+            raise ValueError("kaputt")
+        except ValueError:
+            logging.getLogger('test').exception("Fehler")
+        pipeline.stop()
+
+        output = self.stream.getvalue()
+        self.assertFalse(Expensive.formatted)
+        self.assertIn("- ERROR - [-] Fehler", output)
+        self.assertIn("ValueError: kaputt", output)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test that a full queue never blocks the caller"""
+        pipeline = LoggingPipeline(queue_size=2, stream=self.stream)
+        self.root.addHandler(pipeline.handler)
+        self.root.setLevel(logging.INFO)
+        for i in range(5):
+            logging.getLogger('test').info("Eintrag %d", i)
+        self.root.removeHandler(pipeline.handler)
+
+        self.assertEqual(pipeline.depth, 2)
+        self.assertEqual(pipeline.dropped, 3)
+
+if __name__ == '__main__':
+    unittest.main()
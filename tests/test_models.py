@@ -0,0 +1,122 @@
+import unittest
+import ipaddress
+import os
+import shutil
+import tempfile
+import json
+from unittest.mock import patch, MagicMock, AsyncMock
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Computer, parse_mac, format_mac, parse_ip
+import server
+
+class TestComputer(unittest.TestCase):
+    def test_mac_round_trip(self):
+        """Test that MAC addresses are stored as integers and formatted canonically"""
+        self.assertEqual(parse_mac('aa-bb-cc-dd-ee-ff'), 0xAABBCCDDEEFF)
+        self.assertEqual(parse_mac('AA:BB:CC:DD:EE:FF'), parse_mac('aa:bb:cc:dd:ee:ff'))
+        self.assertEqual(format_mac(parse_mac('00-11-22-aa-bb-cc')), '00:11:22:AA:BB:CC')
+        with self.assertRaises(ValueError):
+            parse_mac('00:11:22:33:44')
+
+    def test_ip_parsing(self):
+        """Test IPv4 parsing including leading zeros and invalid octets"""
+        self.assertEqual(parse_ip('192.168.001.010'), ipaddress.IPv4Address('192.168.1.10'))
+        for ip in ('256.1.1.1', '192.168.1', 'abc'):
+            with self.assertRaises(ValueError):
+                parse_ip(ip)
+
+    def test_from_dict_validates(self):
+        """Test that invalid entries are rejected when loading"""
+        with self.assertRaises(ValueError):
+            Computer.from_dict('pc1', {'mac': '00:11:22:33:44:55'})
+        with self.assertRaises(ValueError):
+            Computer.from_dict('pc1', {'mac': '00:11:22:33:44:55', 'ip': '192.168.1.1', 'port': 70000})
+
+    def test_from_dict_rejects_non_strings(self):
+        """Test that non-string fields raise ValueError instead of TypeError"""
+        for data in ({'mac': None, 'ip': '192.168.1.1'},
+                     {'mac': '00:11:22:33:44:55', 'ip': 5},
+                     {'mac': '00:11:22:33:44:55', 'ip': '192.168.1.1', 'broadcast': 7},
+                     {'mac': '00:11:22:33:44:55', 'ip': '192.168.1.1', 'port': [7]}):
+            with self.assertRaises(ValueError):
+                Computer.from_dict('pc1', data)
+
+    def test_to_dict_schema(self):
+        """Test that the JSON schema stays compatible"""
+        data = {'mac': 'aa-bb-cc-dd-ee-ff', 'ip': '192.168.1.100', 'broadcast': '192.168.1.255', 'port': 7}
+        computer = Computer.from_dict('pc1', data)
+        self.assertEqual(computer.to_dict(), {
+            'mac': 'AA:BB:CC:DD:EE:FF', 'ip': '192.168.1.100', 'broadcast': '192.168.1.255', 'port': 7
+        })
+        self.assertEqual(Computer.from_dict('pc1', computer.to_dict()), computer)
+        self.assertEqual(Computer.from_dict('pc2', {'mac': '00:11:22:33:44:55', 'ip': '10.0.0.1'}).to_dict(),
+                         {'mac': '00:11:22:33:44:55', 'ip': '10.0.0.1'})
+
+class TestInventory(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.computers_file = os.path.join(self.test_dir, "computers.json")
+        self.env = patch.dict(os.environ, {
+            'COMPUTERS_FILE': self.computers_file,
+            'ALLOWED_USERS': '12345'
+        })
+        self.env.start()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+
+    def tearDown(self):
+        self.env.stop()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+        shutil.rmtree(self.test_dir)
+
+    def make_update(self):
+        update = MagicMock()
+        update.effective_user.id = 12345
+        update.message = AsyncMock()
+        return update
+
+    async def test_add_stores_canonical_mac(self):
+        """Test that /add stores the canonical MAC spelling"""
+        context = MagicMock()
+        context.args = ['pc1', 'aa-bb-cc-dd-ee-ff', '192.168.1.100']
+        await server.add_computer(self.make_update(), context)
+
+        with open(self.computers_file, 'r') as f:
+            self.assertEqual(json.load(f), {'pc1': {'mac': 'AA:BB:CC:DD:EE:FF', 'ip': '192.168.1.100'}})
+
+    async def test_load_inventory_skips_invalid(self):
+        """Test that invalid entries are skipped instead of breaking the inventory"""
+        server.save_computers({
+            'pc1': {'mac': '00:11:22:33:44:55', 'ip': '192.168.1.100'},
+            'broken': {'mac': 'not-a-mac', 'ip': '192.168.1.101'},
+            'null': {'mac': None, 'ip': 5}
+        })
+        with self.assertLogs(server.logger, 'ERROR'):
+            inventory = await server.load_inventory()
+        self.assertEqual(list(inventory), ['pc1'])
+        self.assertEqual(inventory['pc1'].mac, 0x001122334455)
+
+    async def test_load_inventory_is_cached(self):
+        """Test that the parsed inventory is reused until the storage changes"""
+        server.save_computers({'pc1': {'mac': '00:11:22:33:44:55', 'ip': '192.168.1.100'}})
+        with patch.object(server.Computer, 'from_dict', wraps=Computer.from_dict) as from_dict:
+            self.assertEqual(list(await server.load_inventory()), ['pc1'])
+            self.assertEqual(list(await server.load_inventory()), ['pc1'])
+            self.assertEqual(from_dict.call_count, 1)
+
+            self.assertTrue(await server.store_computer('pc2', {'mac': '00:11:22:33:44:66', 'ip': '192.168.1.101'}))
+            self.assertEqual(sorted(await server.load_inventory()), ['pc1', 'pc2'])
+
+            # Änderungen von außen erkennt die Änderungszeit bzw. Größe der Datei
+            with open(self.computers_file, 'w') as f:
+                json.dump({'pc3': {'mac': '00:11:22:33:44:77', 'ip': '192.168.1.102'}}, f)
+            self.assertEqual(list(await server.load_inventory()), ['pc3'])
+
+            self.assertTrue(await server.delete_computer('pc3'))
+            self.assertEqual(await server.load_inventory(), {})
+
+if __name__ == '__main__':
+    unittest.main()
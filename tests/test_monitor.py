@@ -0,0 +1,134 @@
+import unittest
+import asyncio
+import logging
+import os
+import threading
+import time
+from unittest.mock import patch, MagicMock, AsyncMock
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monitor import LoopLagMonitor, sample_stacks
+import server
+
+def blocking_call():
+    time.sleep(0.3)
+
+class TestLoopLagMonitor(unittest.IsolatedAsyncioTestCase):
+    async def test_blocking_call_is_logged_with_stack(self):
+        """Test that a blocked loop is detected and the blocking function is logged"""
+        monitor = LoopLagMonitor(interval=0.02, threshold=0.1)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            with self.assertLogs('monitor', level=logging.WARNING) as logs:
+                blocking_call()
+                await asyncio.sleep(0.05)
+        finally:
+            monitor.stop()
+
+        self.assertEqual(monitor.stalls, 1)
+        self.assertIn("blocking_call", logs.output[0])
+        summary = monitor.summary()
+        self.assertGreaterEqual(summary['max'], 0.2)
+        self.assertLessEqual(summary['p50'], summary['max'])
+
+    async def test_block_right_after_tick_is_detected(self):
+        """Test that a block of twice the threshold is reported even right after a lag sample"""
+        monitor = LoopLagMonitor(interval=0.5, threshold=0.1)
+        monitor.start()
+        try:
+            # Kurz nach dem ersten Messpunkt blockieren
+            await asyncio.sleep(0.52)
+            with self.assertLogs('monitor', level=logging.WARNING):
+                time.sleep(0.2)
+                await asyncio.sleep(0.05)
+        finally:
+            monitor.stop()
+
+        self.assertEqual(monitor.stalls, 1)
+
+    def test_sample_stacks(self):
+        """Test that the sampling profiler attributes time to the busy function"""
+        stop = threading.Event()
+
+        def busy_worker():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=busy_worker)
+        worker.start()
+        try:
+            samples, own, cumulative = sample_stacks(worker.ident, 0.2, interval=0.002)
+        finally:
+            stop.set()
+            worker.join()
+
+        self.assertGreater(samples, 10)
+        self.assertTrue(any('busy_worker' in key and share > 0.5 for share, key in cumulative))
+
+class TestDebugCommand(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.env = patch.dict(os.environ, {'ALLOWED_USERS': '1,2', 'ADMIN_USERS': '1'})
+        self.env.start()
+        server.reload_config(os.devnull)
+
+    def tearDown(self):
+        self.env.stop()
+        server.reload_config(os.devnull)
+
+    def make_update(self, user_id, *args):
+        update = MagicMock()
+        update.effective_user.id = user_id
+        update.message = AsyncMock()
+        context = MagicMock()
+        context.args = list(args)
+        context.application.update_queue.qsize.return_value = 3
+        return update, context
+
+    async def test_debug_report(self):
+        """Test that admins get tasks, wake jobs, loop lag and queue depths"""
+        monitor = LoopLagMonitor(interval=0.01, threshold=0)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        job = {'id': 'ab12', 'name': 'pc1', 'tries': 4, 'packets': 2, 'started': time.time()}
+        update, context = self.make_update(1)
+        try:
+            with patch.object(server, 'loop_monitor', monitor), patch.dict(server.wake_jobs, {'ab12': job}):
+                await server.debug_info(update, context)
+        finally:
+            monitor.stop()
+
+        reply = update.message.reply_text.call_args.args[0]
+        self.assertIn("LoopLagMonitor._sample: 1", reply)
+        self.assertIn("pc1 [ab12]: Versuch 4, 2 Pakete", reply)
+        self.assertIn("Loop-Lag (", reply)
+        self.assertIn("Updates: 3", reply)
+
+    async def test_debug_profile(self):
+        """Test on-demand profiling of the event loop for a fixed window"""
+        update, context = self.make_update(1, 'profile', '0.2')
+        await server.debug_info(update, context)
+
+        status_message = update.message.reply_text.return_value
+        report = status_message.edit_text.call_args.args[0]
+        self.assertIn("Profil des Event-Loops", report)
+        self.assertIn("Kumulativ:", report)
+
+    async def test_debug_profile_rejects_invalid_seconds(self):
+        """Test that non-positive or non-finite durations get the usage message"""
+        for seconds in ('-1', '0', 'nan', 'inf', 'abc'):
+            update, context = self.make_update(1, 'profile', seconds)
+            await server.debug_info(update, context)
+            update.message.reply_text.assert_called_once_with("❌ Bitte nutze: /debug profile [sekunden]")
+
+    async def test_debug_requires_admin(self):
+        """Test that allowed users without admin rights are rejected"""
+        update, context = self.make_update(2)
+        await server.debug_info(update, context)
+        update.message.reply_text.assert_called_once_with("❌ /debug ist nur für Administratoren verfügbar.")
+
+if __name__ == '__main__':
+    unittest.main()
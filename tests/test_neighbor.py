@@ -0,0 +1,88 @@
+import unittest
+import asyncio
+import os
+import socket
+import struct
+import time
+from unittest.mock import patch, AsyncMock
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neighbor import (
+    NeighborWatcher, parse_neighbor_messages, mac_key,
+    RTM_NEWNEIGH, NDA_DST, NDA_LLADDR, NUD_REACHABLE, NUD_STALE
+)
+import server
+
+def neighbor_message(ip, mac, state, msg_type=RTM_NEWNEIGH):
+    """Baut eine RTM_NEWNEIGH-Meldung wie vom Kernel"""
+    attrs = b''
+    for attr_type, value in ((NDA_DST, socket.inet_aton(ip)), (NDA_LLADDR, bytes.fromhex(mac.replace(':', '')))):
+        attr = struct.pack('=HH', 4 + len(value), attr_type) + value
+        attrs += attr + b'\0' * (-len(attr) % 4)
+    body = struct.pack('=BxxxiHBB', socket.AF_INET, 2, state, 0, 1) + attrs
+    return struct.pack('=LHHLL', 16 + len(body), msg_type, 0, 0, 0) + body
+
+class TestNeighborWatcher(unittest.IsolatedAsyncioTestCase):
+    def test_parse_messages(self):
+        """Test parsing of several neighbor messages in one datagram"""
+        data = neighbor_message('192.168.1.100', '00:11:22:33:44:55', NUD_REACHABLE)
+        data += neighbor_message('192.168.1.101', 'aa:bb:cc:dd:ee:ff', NUD_STALE)
+        data += neighbor_message('192.168.1.102', 'aa:bb:cc:dd:ee:01', NUD_STALE, msg_type=29)
+
+        self.assertEqual(list(parse_neighbor_messages(data)), [
+            (NUD_REACHABLE, '192.168.1.100', 0x001122334455),
+            (NUD_STALE, '192.168.1.101', 0xaabbccddeeff)
+        ])
+        self.assertEqual(mac_key('AA-BB-CC-DD-EE-FF'), 0xaabbccddeeff)
+
+    async def test_dispatch_wakes_waiters(self):
+        """Test that only matching MACs in a seen state set the event"""
+        watcher = NeighborWatcher()
+        event = watcher.register('00:11:22:33:44:55')
+
+        watcher.dispatch(neighbor_message('192.168.1.100', '00:11:22:33:44:55', 0x10))  # NUD_PROBE
+        watcher.dispatch(neighbor_message('192.168.1.101', 'aa:bb:cc:dd:ee:ff', NUD_REACHABLE))
+        self.assertFalse(event.is_set())
+
+        watcher.dispatch(neighbor_message('192.168.1.100', '00:11:22:33:44:55', NUD_REACHABLE))
+        self.assertTrue(event.is_set())
+
+        watcher.unregister('00-11-22-33-44-55', event)
+        self.assertEqual(watcher.pending, 0)
+
+    @patch('server.ping', new_callable=AsyncMock)
+    async def test_wait_until_online_returns_early(self, mock_ping):
+        """Test that a neighbor event ends the wait before the polling interval"""
+        watcher = NeighborWatcher()
+        mock_ping.side_effect = [False, True]
+        message = neighbor_message('192.168.1.100', '00:11:22:33:44:55', NUD_STALE)
+
+        async def announce():
+            for _ in range(2):
+                await asyncio.sleep(0.05)
+                watcher.dispatch(message)
+
+        with patch.object(server, 'neighbor_watcher', watcher):
+            started = time.monotonic()
+            announcer = asyncio.create_task(announce())
+            self.assertTrue(await server.wait_until_online('192.168.1.100', '00:11:22:33:44:55', 5))
+            await announcer
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(mock_ping.call_count, 2)
+        self.assertEqual(watcher.pending, 0)
+
+    async def test_netlink_socket(self):
+        """Test subscribing to the kernel's neighbor group where netlink is available"""
+        watcher = NeighborWatcher()
+        try:
+            watcher.start()
+        except (OSError, AttributeError) as e:
+            self.skipTest(f"Netlink nicht verfügbar: {e}")
+        watcher.stop()
+
+if __name__ == '__main__':
+    unittest.main()
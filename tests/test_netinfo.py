@@ -0,0 +1,72 @@
+import unittest
+import ipaddress
+import os
+import tempfile
+from unittest.mock import patch
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netinfo import read_routes, WolTargetResolver, WolTarget, Route
+import server
+
+ROUTE_TABLE = """Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT
+eth0\t00000000\t0101A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0
+eth0\t0001A8C0\t00000000\t0001\t0\t0\t100\t00FFFFFF\t0\t0\t0
+eth1\t0000000A\t00000000\t0001\t0\t0\t0\t0000FFFF\t0\t0\t0
+eth2\t0000000A\t00000000\t0000\t0\t0\t0\t0000FFFF\t0\t0\t0
+"""
+
+INTERFACE_ADDRESSES = {'eth0': '192.168.1.2', 'eth1': '10.0.0.2'}
+
+class TestWolTargets(unittest.TestCase):
+    def setUp(self):
+        fd, self.route_file = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write(ROUTE_TABLE)
+        self.reads = 0
+
+        def route_reader():
+            self.reads += 1
+            return read_routes(self.route_file)
+
+        self.resolver = WolTargetResolver(route_reader, INTERFACE_ADDRESSES.get)
+
+    def tearDown(self):
+        os.remove(self.route_file)
+
+    def test_read_routes(self):
+        """Test parsing of /proc/net/route, skipping routes that are down"""
+        routes = read_routes(self.route_file)
+        self.assertEqual(len(routes), 3)
+        self.assertEqual(routes[0], Route(ipaddress.IPv4Network('0.0.0.0/0'), 'eth0',
+                                          ipaddress.IPv4Address('192.168.1.1'), 100))
+        self.assertEqual(routes[2].network, ipaddress.IPv4Network('10.0.0.0/16'))
+        self.assertEqual(read_routes(self.route_file + '.missing'), [])
+
+    def test_directed_broadcast_per_subnet(self):
+        """Test that each host gets the broadcast and source address of its subnet"""
+        self.assertEqual(self.resolver.resolve('192.168.1.50'), WolTarget('192.168.1.255', 9, '192.168.1.2'))
+        self.assertEqual(self.resolver.resolve('10.0.7.9'), WolTarget('10.0.255.255', 9, '10.0.0.2'))
+        # Über das Gateway erreichbare Netze: Standard-Broadcast, aber richtiges Interface
+        self.assertEqual(self.resolver.resolve('172.16.0.5'), WolTarget('255.255.255.255', 9, '192.168.1.2'))
+        # Routing-Tabelle wird nur einmal gelesen
+        self.assertEqual(self.reads, 1)
+
+    def test_host_overrides(self):
+        """Test per-host broadcast and port overrides"""
+        self.assertEqual(self.resolver.resolve('10.0.7.9', '10.0.7.255', 7), WolTarget('10.0.7.255', 7, '10.0.0.2'))
+        self.assertEqual(self.resolver.resolve('kein-ip', port='9'), WolTarget())
+
+    @patch('server.send_magic_packet')
+    def test_send_wake_packet(self, mock_send_magic_packet):
+        """Test that the server passes the resolved target to wakeonlan"""
+        with patch.object(server, 'wol_targets', self.resolver):
+            server.send_wake_packet('00:11:22:33:44:55', '192.168.1.50', port=7)
+        mock_send_magic_packet.assert_called_once_with(
+            '00:11:22:33:44:55', ip_address='192.168.1.255', port=7, interface='192.168.1.2'
+        )
+
+if __name__ == '__main__':
+    unittest.main()
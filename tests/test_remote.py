@@ -0,0 +1,170 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram.error import NetworkError
+from remote import SSHPool
+import server
+
+FAKE_SSH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_ssh.py')
+
+def read_log(path):
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f]
+
+class TestSSHPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.test_dir, "ssh.log")
+        self.env = patch.dict(os.environ, {'FAKE_SSH_LOG': self.log_file, 'FAKE_SSH_OUTPUT': 'ok'})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.test_dir)
+
+    def make_pool(self, max_parallel=4):
+        return SSHPool((sys.executable, FAKE_SSH), user='admin',
+                       control_dir=os.path.join(self.test_dir, "control"), max_parallel=max_parallel)
+
+    async def test_connection_is_reused(self):
+        """Test that only the first command per host opens a master connection"""
+        pool = self.make_pool()
+        result = await pool.run('192.168.1.100', 'uptime')
+        await pool.run('192.168.1.100', 'uptime')
+        await pool.run('192.168.1.101', 'uptime')
+        self.assertEqual((result.returncode, result.output), (0, 'ok'))
+
+        log = read_log(self.log_file)
+        self.assertEqual([(e['target'], e['master']) for e in log],
+                         [('admin@192.168.1.100', True), ('admin@192.168.1.100', False), ('admin@192.168.1.101', True)])
+
+        await pool.close()
+        self.assertEqual(os.listdir(pool.control_dir), [])
+        self.assertEqual(pool.hosts, frozenset())
+
+    async def test_parallelism_is_bounded(self):
+        """Test that no more than max_parallel commands run at the same time"""
+        pool = self.make_pool(max_parallel=2)
+        with patch.dict(os.environ, {'FAKE_SSH_DELAY': '0.2'}):
+            await asyncio.gather(*(pool.run(f'10.0.0.{i}', 'true') for i in range(4)))
+
+        log = read_log(self.log_file)
+        peak = max(sum(1 for other in log if other['start'] <= e['start'] < other['end']) for e in log)
+        self.assertLessEqual(peak, 2)
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), "Nur auf POSIX-Systemen")
+    async def test_insecure_control_dir_is_refused(self):
+        """Test that an existing control directory with loose permissions is not used"""
+        pool = self.make_pool()
+        os.makedirs(pool.control_dir, mode=0o777)
+        os.chmod(pool.control_dir, 0o777)
+
+        with self.assertRaises(PermissionError):
+            await pool.run('192.168.1.100', 'uptime')
+        self.assertFalse(os.path.exists(self.log_file))
+
+class TestPowerCommands(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.test_dir, "ssh.log")
+        self.env = patch.dict(os.environ, {
+            'COMPUTERS_FILE': os.path.join(self.test_dir, "computers.json"),
+            'SSH_COMMAND': f'{sys.executable} {FAKE_SSH}',
+            'SSH_USER': 'admin',
+            'SSH_CONTROL_DIR': os.path.join(self.test_dir, "control"),
+            'FAKE_SSH_LOG': self.log_file,
+            'CHECK_INTERVAL': '0',
+            'OFFLINE_TIMEOUT': '5',
+            'ALLOWED_USERS': '12345'
+        })
+        self.env.start()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+        server.save_computers({'pc1': {'mac': '00:11:22:33:44:55', 'ip': '192.168.1.100'}})
+        self.context = MagicMock()
+        self.context.bot = AsyncMock()
+
+    async def asyncTearDown(self):
+        await server.post_shutdown(MagicMock())
+
+    def tearDown(self):
+        self.env.stop()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+        shutil.rmtree(self.test_dir)
+
+    @patch('server.ping')
+    async def test_sleep_waits_until_offline(self, mock_ping):
+        """Test that /sleep runs the configured command and confirms via ping"""
+        mock_ping.side_effect = [True, True, True, False]
+        computer = (await server.load_inventory())['pc1']
+
+        await server.power_off_computer(self.context, 1, computer, 'sleep')
+
+        log = read_log(self.log_file)
+        self.assertEqual([(e['target'], e['command']) for e in log], [('admin@192.168.1.100', 'sudo systemctl suspend')])
+        self.assertIn("ist offline", self.context.bot.send_message.call_args.kwargs['text'])
+        self.assertEqual(server.power_jobs, {})
+
+    @patch('server.ping')
+    async def test_failed_command_is_reported(self, mock_ping):
+        """Test that a failing remote command is reported without waiting for the timeout"""
+        mock_ping.return_value = True
+        computer = (await server.load_inventory())['pc1']
+
+        with patch.dict(os.environ, {'FAKE_SSH_EXIT': '1', 'FAKE_SSH_OUTPUT': 'sudo: a password is required'}):
+            await server.power_off_computer(self.context, 1, computer, 'shutdown')
+
+        text = self.context.bot.send_message.call_args.kwargs['text']
+        self.assertIn("Exit-Code 1", text)
+        self.assertIn("password is required", text)
+        self.assertEqual(mock_ping.call_count, 1)
+
+    @patch('server.ping')
+    async def test_offline_computer_is_skipped(self, mock_ping):
+        """Test that no SSH connection is made to a computer that is already offline"""
+        mock_ping.return_value = False
+        computer = (await server.load_inventory())['pc1']
+
+        await server.power_off_computer(self.context, 1, computer, 'sleep')
+
+        self.assertFalse(os.path.exists(self.log_file))
+        self.assertIn("bereits offline", self.context.bot.send_message.call_args.kwargs['text'])
+
+    @patch('server.ping')
+    async def test_telegram_errors_do_not_abort_job(self, mock_ping):
+        """Test that a failed status message does not end the power job"""
+        mock_ping.side_effect = [True, False]
+        self.context.bot.send_message.side_effect = NetworkError("flaky")
+        computer = (await server.load_inventory())['pc1']
+
+        with self.assertLogs(server.logger, 'WARNING'):
+            await server.power_off_computer(self.context, 1, computer, 'sleep')
+
+        self.assertIn("ist offline", self.context.bot.send_message.call_args.kwargs['text'])
+        self.assertEqual(server.power_jobs, {})
+
+    async def test_shutdown_drains_power_jobs(self):
+        """Test that running power jobs get the shutdown grace period instead of being cancelled"""
+        async def slow_ping(ip):
+            await asyncio.sleep(0.05)
+            return slow_ping.responses.pop(0)
+        slow_ping.responses = [True, True, False]
+        computer = (await server.load_inventory())['pc1']
+
+        with patch('server.ping', slow_ping):
+            task = server.track_power_task(server.power_off_computer(self.context, 1, computer, 'shutdown'))
+            await server.post_stop(MagicMock())
+
+        self.assertFalse(task.cancelled())
+        self.assertIn("ist offline", self.context.bot.send_message.call_args.kwargs['text'])
+
+if __name__ == '__main__':
+    unittest.main()
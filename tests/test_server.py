@@ -5,6 +5,7 @@ import tempfile
 from unittest.mock import patch, MagicMock, AsyncMock
 import sys
 import asyncio
+import subprocess
 
 # Add the parent directory to the Python path to import server.py
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,7 +16,10 @@ from server import (
     load_computers,
     save_computers,
     check_permission,
-    ensure_env_defaults
+    ensure_env_defaults,
+    get_config,
+    reload_config,
+    Config
 )
 
 class TestWakeOnLANServer(unittest.TestCase):
@@ -127,6 +131,64 @@ class TestWakeOnLANServer(unittest.TestCase):
         for default in expected_defaults:
             self.assertIn(default, content)
             
+    def test_ensure_env_defaults_keeps_comments(self):
+        """Test that existing lines and comments survive adding defaults"""
+        with open(self.env_file, 'w') as f:
+            f.write("# Bot-Zugang\nTELEGRAM_TOKEN=test_token\nMAX_TRIES=5")
+
+        ensure_env_defaults(self.env_file)
+
+        with open(self.env_file, 'r') as f:
+            lines = f.read().splitlines()
+
+        self.assertEqual(lines[:3], ["# Bot-Zugang", "TELEGRAM_TOKEN=test_token", "MAX_TRIES=5"])
+        self.assertNotIn("MAX_TRIES=30", lines)
+        self.assertIn("CHECK_INTERVAL=10", lines)
+
+    def test_import_has_no_side_effects(self):
+        """Test that importing server.py does not create or touch any files"""
+        repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run(
+            [sys.executable, '-c', 'import server'],
+            cwd=self.test_dir,
+            env={**os.environ, 'PYTHONPATH': repo_dir},
+            check=True
+        )
+        self.assertFalse(os.path.exists(self.env_file))
+
+    def test_reload_config(self):
+        """Test that configuration changes are picked up and invalid values are ignored"""
+        with open(self.env_file, 'w') as f:
+            f.write("ALLOWED_USERS=1,2\nMAX_TRIES=7\n")
+
+        with patch.dict(os.environ, clear=False):
+            for key in ('ALLOWED_USERS', 'MAX_TRIES'):
+                os.environ.pop(key, None)
+
+            config = reload_config(self.env_file)
+            self.assertIsInstance(config, Config)
+            self.assertEqual(config.allowed_users, frozenset({1, 2}))
+            self.assertEqual(config.max_tries, 7)
+            self.assertIs(get_config(), config)
+
+            # Ungültige Werte lassen die bisherige Konfiguration aktiv
+            with open(self.env_file, 'w') as f:
+                f.write("MAX_TRIES=viele\n")
+            self.assertIs(reload_config(self.env_file), config)
+
+            # Werte außerhalb des erlaubten Bereichs ebenso
+            for line in ("MAX_TRIES=0", "CHECK_INTERVAL=-1", "CONFIG_WATCH_INTERVAL=-1", "READ_TIMEOUT=0", "SHUTDOWN_TIMEOUT=nan"):
+                with open(self.env_file, 'w') as f:
+                    f.write(line + "\n")
+                with self.assertLogs('server', 'ERROR'):
+                    self.assertIs(reload_config(self.env_file), config)
+            with open(self.env_file, 'w') as f:
+                f.write("MAX_TRIES=7\n")
+
+            # Umgebungsvariablen haben Vorrang vor der .env-Datei
+            os.environ['MAX_TRIES'] = '3'
+            self.assertEqual(reload_config(self.env_file).max_tries, 3)
+
     @patch('server.Update')
     async def test_check_permission(self, mock_update):
         """Test permission checking"""
@@ -0,0 +1,123 @@
+import unittest
+import asyncio
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+import threading
+from unittest.mock import patch
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_store import open_store, close_stores, migrate_json
+import server
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.test_dir, "computers.db")
+        self.json_file = os.path.join(self.test_dir, "computers.json")
+        self.computers = {
+            "pc1": {"mac": "00:11:22:33:44:55", "ip": "192.168.1.100"},
+            "pc2": {"mac": "AA:BB:CC:DD:EE:FF", "ip": "192.168.1.101", "port": 7}
+        }
+
+    def tearDown(self):
+        close_stores()
+        shutil.rmtree(self.test_dir)
+
+    def test_wal_mode_and_indexes(self):
+        """Test that the database runs in WAL mode with indexed columns"""
+        open_store(self.db_file)
+        conn = sqlite3.connect(self.db_file)
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(computers)")}
+        finally:
+            conn.close()
+        self.assertIn("idx_computers_mac", indexes)
+        self.assertIn("idx_computers_ip", indexes)
+
+    def test_save_load_roundtrip(self):
+        """Test that save_all/load_all keep the JSON schema and remove stale entries"""
+        store = open_store(self.db_file)
+        store.save_all(self.computers)
+        self.assertEqual(store.load_all(), self.computers)
+
+        store.save_all({"pc2": self.computers["pc2"]})
+        self.assertEqual(store.load_all(), {"pc2": self.computers["pc2"]})
+
+    def test_single_entry_operations(self):
+        """Test upsert, lookup and delete of single computers"""
+        store = open_store(self.db_file)
+        store.upsert("pc1", self.computers["pc1"])
+        self.assertEqual(store.get("pc1"), self.computers["pc1"])
+        self.assertIsNone(store.get("missing"))
+
+        # Suche ignoriert Trennzeichen, Groß-/Kleinschreibung und führende Nullen
+        self.assertEqual(store.find_by_mac("00-11-22-33-44-55"), {"pc1": self.computers["pc1"]})
+        self.assertEqual(store.find_by_ip("192.168.001.100"), {"pc1": self.computers["pc1"]})
+
+        # Gespeichert wird die kanonische Schreibweise
+        store.upsert("pc2", {"mac": "aa-bb-cc-dd-ee-ff", "ip": "192.168.1.101"})
+        self.assertEqual(store.get("pc2")["mac"], "AA:BB:CC:DD:EE:FF")
+        self.assertEqual(list(store.find_by_mac("aa:bb:cc:dd:ee:ff")), ["pc2"])
+
+        store.upsert("pc1", {"mac": "00:11:22:33:44:55", "ip": "192.168.1.200"})
+        self.assertEqual(store.get("pc1")["ip"], "192.168.1.200")
+
+        self.assertTrue(store.delete("pc1"))
+        self.assertFalse(store.delete("pc1"))
+
+    def test_migrate_json(self):
+        """Test the one-shot migration from computers.json"""
+        with open(self.json_file, 'w') as f:
+            json.dump(self.computers, f)
+
+        self.assertEqual(migrate_json(self.json_file, self.db_file), 2)
+        self.assertEqual(open_store(self.db_file).load_all(), self.computers)
+
+    def test_server_uses_sqlite_backend(self):
+        """Test that the server helpers use the configured SQLite backend"""
+        env = {"STORAGE_BACKEND": "sqlite", "DATABASE_FILE": self.db_file}
+        try:
+            with patch.dict(os.environ, env):
+                server.reload_config(os.path.join(self.test_dir, ".env"))
+                server.save_computers(self.computers)
+                self.assertEqual(server.load_computers(), self.computers)
+
+                self.assertTrue(asyncio.run(server.store_computer("pc3", {"mac": "00:00:00:00:00:01", "ip": "10.0.0.1"})))
+                self.assertEqual(asyncio.run(server.get_computer("pc3")), {"mac": "00:00:00:00:00:01", "ip": "10.0.0.1"})
+                self.assertTrue(asyncio.run(server.delete_computer("pc3")))
+                self.assertFalse(os.path.exists(self.json_file))
+
+                # Gesperrte oder defekte Datenbank wird gemeldet statt den Handler abzubrechen
+                store = open_store(self.db_file)
+                error = sqlite3.OperationalError("database is locked")
+                with patch.object(store, 'get', side_effect=error), \
+                        patch.object(store, 'upsert', side_effect=error), \
+                        patch.object(store, 'delete', side_effect=error), \
+                        self.assertLogs(server.logger, 'ERROR'):
+                    self.assertIsNone(asyncio.run(server.get_computer("pc1")))
+                    self.assertFalse(asyncio.run(server.store_computer("pc3", {"mac": "00:00:00:00:00:01", "ip": "10.0.0.1"})))
+                    self.assertIsNone(asyncio.run(server.delete_computer("pc1")))
+
+                # Alle laden läuft ebenfalls außerhalb des Event-Loops
+                loop_threads = []
+                with patch.object(store, 'load_all', side_effect=lambda: loop_threads.append(threading.get_ident()) or {}):
+                    asyncio.run(server.load_inventory())
+                self.assertEqual(len(loop_threads), 1)
+                self.assertNotEqual(loop_threads[0], threading.get_ident())
+                server.invalidate_inventory()
+                with patch.object(store, 'load_all', side_effect=error), self.assertLogs(server.logger, 'ERROR'):
+                    self.assertEqual(asyncio.run(server.load_inventory()), {})
+                # Der Fehler wird nicht gecacht
+                self.assertEqual(set(asyncio.run(server.load_inventory())), set(self.computers))
+        finally:
+            server.reload_config(os.path.join(self.test_dir, ".env"))
+
+if __name__ == '__main__':
+    unittest.main()
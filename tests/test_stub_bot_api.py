@@ -0,0 +1,51 @@
+import unittest
+import json
+import os
+import sys
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+# Add the loadtest directory to the Python path to import the stub
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'loadtest'))
+
+from stub_bot_api import StubServer
+
+class TestStubBotAPI(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def call(self, method, **params):
+        data = urlencode({key: value if isinstance(value, str) else json.dumps(value) for key, value in params.items()})
+        with urlopen(f"{self.server.base_url}123:stub/{method}", data=data.encode('utf-8'), timeout=5) as response:
+            return json.loads(response.read())['result']
+
+    def test_updates_and_latency(self):
+        """Test that injected commands are delivered and replies are matched per chat"""
+        api = self.server.api
+        api.inject_command(42, "/list")
+        api.inject_command(43, "/wake pc1")
+
+        updates = self.call('getUpdates', offset=0, timeout=1)
+        self.assertEqual([u['message']['text'] for u in updates], ["/list", "/wake pc1"])
+        self.assertEqual(updates[1]['message']['entities'][0]['length'], len("/wake"))
+
+        # Bestätigte Updates werden nicht erneut ausgeliefert
+        self.assertEqual(self.call('getUpdates', offset=updates[-1]['update_id'] + 1, timeout=0), [])
+
+        message = self.call('sendMessage', chat_id=42, text="Antwort")
+        self.assertEqual(message['chat']['id'], 42)
+        self.assertEqual(message['text'], "Antwort")
+        self.assertEqual(len(api.latencies), 1)
+        self.assertEqual(api.unanswered, 1)
+        self.assertEqual(api.requests['getUpdates'], 2)
+
+    def test_long_polling_times_out(self):
+        """Test that getUpdates waits for the timeout and returns an empty list"""
+        self.assertEqual(self.call('getUpdates', offset=0, timeout=0.2), [])
+        self.assertEqual(self.call('getMe')['username'], 'stub_bot')
+
+if __name__ == '__main__':
+    unittest.main()
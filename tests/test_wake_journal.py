@@ -0,0 +1,142 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, MagicMock, AsyncMock
+import sys
+
+# Add the parent directory to the Python path to import server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram.error import NetworkError
+from wake_journal import WakeJournal
+import server
+
+class TestWakeJournal(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.journal_file = os.path.join(self.test_dir, "wake_jobs.json")
+        self.env = patch.dict(os.environ, {
+            'WAKE_JOURNAL_FILE': self.journal_file,
+            'HISTORY_FILE': os.path.join(self.test_dir, "history.log"),
+            'MAX_TRIES': '4',
+            'CHECK_INTERVAL': '0',
+            'SHUTDOWN_TIMEOUT': '0.2'
+        })
+        self.env.start()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+        self.context = MagicMock()
+        self.context.bot = AsyncMock()
+
+    def tearDown(self):
+        self.env.stop()
+        server.reload_config(os.path.join(self.test_dir, ".env"))
+        shutil.rmtree(self.test_dir)
+
+    def messages(self):
+        return [call.kwargs['text'] for call in self.context.bot.send_message.call_args_list]
+
+    def test_checkpoint_and_remove(self):
+        """Test that the journal survives a reload and is replaced atomically"""
+        journal = WakeJournal(self.journal_file)
+        journal.checkpoint({'id': 'a1', 'name': 'pc1', 'tries': 2})
+        journal.checkpoint({'id': 'b2', 'name': 'pc2', 'tries': 0})
+        journal.remove('b2')
+
+        self.assertEqual(WakeJournal(self.journal_file).load(), {'a1': {'id': 'a1', 'name': 'pc1', 'tries': 2}})
+        self.assertEqual(os.listdir(self.test_dir), ["wake_jobs.json"])
+
+        with open(self.journal_file, 'w') as f:
+            f.write("{kaputt")
+        self.assertEqual(WakeJournal(self.journal_file).load(), {})
+
+    @patch('server.send_magic_packet')
+    @patch('server.ping')
+    async def test_interrupted_job_is_resumed(self, mock_ping, mock_send_magic_packet):
+        """Test that a cancelled job keeps its state and resumes with the remaining tries"""
+        mock_ping.return_value = False
+        started = asyncio.Event()
+
+        async def slow_wait(ip, mac, timeout):
+            started.set()
+            await asyncio.sleep(60)
+
+        with patch('server.wait_until_online', slow_wait):
+            task = server.track_wake_task(server.check_computer_status(
+                self.context, 77, 'pc1', '192.168.1.100', '00:11:22:33:44:55'
+            ))
+            await started.wait()
+            self.assertEqual(len(server.wake_jobs), 1)
+            # Graceful Shutdown: Frist läuft ab, Task wird abgebrochen
+            await server.post_stop(MagicMock())
+
+        self.assertTrue(task.cancelled())
+        self.assertEqual(server.wake_jobs, {})
+        jobs = WakeJournal(self.journal_file).load()
+        self.assertEqual(len(jobs), 1)
+        job = next(iter(jobs.values()))
+        self.assertEqual((job['chat_id'], job['name'], job['packets'], job['tries']), (77, 'pc1', 1, 0))
+
+        # Neustart: zwei weitere Versuche schlagen fehl, danach ist der Computer online
+        job['tries'] = 2
+        WakeJournal(self.journal_file).checkpoint(job)
+        mock_ping.reset_mock()
+        mock_ping.side_effect = [False, True]
+        application = MagicMock()
+        application.bot = self.context.bot
+        with patch('server.neighbor_watcher', None):
+            await server.post_init(application)
+            await asyncio.gather(*server._wake_tasks)
+            await server.post_shutdown(application)
+
+        self.assertEqual(mock_ping.call_count, 2)
+        self.assertIn("🔍 Weckvorgang für 'pc1' wird nach Neustart fortgesetzt (Versuch 2/4)", self.messages())
+        self.assertIn("✅ Computer 'pc1' ist jetzt online!", self.messages())
+        self.assertTrue(all(call.kwargs['chat_id'] == 77 for call in self.context.bot.send_message.call_args_list))
+        self.assertEqual(WakeJournal(self.journal_file).load(), {})
+
+    @patch('server.send_magic_packet')
+    @patch('server.ping')
+    async def test_shutdown_drains_finished_jobs(self, mock_ping, mock_send_magic_packet):
+        """Test that jobs finishing within the deadline are not cancelled"""
+        mock_ping.side_effect = [False, True]
+        task = server.track_wake_task(server.check_computer_status(
+            self.context, 1, 'pc1', '192.168.1.100', '00:11:22:33:44:55'
+        ))
+        await server.post_stop(MagicMock())
+
+        self.assertFalse(task.cancelled())
+        self.assertIn("✅ Computer 'pc1' ist jetzt online!", self.messages())
+        self.assertEqual(WakeJournal(self.journal_file).load(), {})
+
+    @patch('server.send_magic_packet')
+    @patch('server.ping')
+    async def test_telegram_errors_do_not_abort_job(self, mock_ping, mock_send_magic_packet):
+        """Test that a failed status message does not end the wake job"""
+        mock_ping.side_effect = [False, False, True]
+        self.context.bot.send_message.side_effect = [NetworkError("Verbindung getrennt"), None]
+
+        await server.check_computer_status(self.context, 1, 'pc1', '192.168.1.100', '00:11:22:33:44:55')
+
+        self.assertEqual(self.messages()[-1], "✅ Computer 'pc1' ist jetzt online!")
+        self.assertEqual(WakeJournal(self.journal_file).load(), {})
+
+    @patch('server.send_magic_packet')
+    @patch('server.ping')
+    async def test_unexpected_error_is_reported(self, mock_ping, mock_send_magic_packet):
+        """Test that an unexpected error is reported, recorded and removed from the journal"""
+        mock_ping.side_effect = [False, RuntimeError("kaputt")]
+
+        with self.assertLogs(server.logger, 'ERROR'):
+            await server.check_computer_status(self.context, 1, 'pc1', '192.168.1.100', '00:11:22:33:44:55')
+
+        self.assertEqual(server.wake_jobs, {})
+        self.assertEqual(WakeJournal(self.journal_file).load(), {})
+        self.assertIn("fehlgeschlagen: kaputt", self.messages()[-1])
+        events = list(server.get_event_log())
+        self.assertEqual([(event['name'], event['result'], event['packets']) for event in events],
+                         [('pc1', server.RESULT_ERROR, 1)])
+
+if __name__ == '__main__':
+    unittest.main()
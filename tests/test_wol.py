@@ -14,10 +14,11 @@ class TestWakeOnLAN(unittest.TestCase):
         os.environ['MAX_TRIES'] = '6'  # Reduziere für schnellere Tests
         os.environ['CHECK_INTERVAL'] = '1'  # 1 Sekunde Intervall für Tests
         
-        # Importiere die Konstanten nach dem Setzen der Umgebungsvariablen
-        from server import MAX_TRIES, CHECK_INTERVAL
-        self.max_tries = MAX_TRIES
-        self.check_interval = CHECK_INTERVAL
+        # Lade die Konfiguration nach dem Setzen der Umgebungsvariablen neu
+        from server import reload_config
+        config = reload_config()
+        self.max_tries = config.max_tries
+        self.check_interval = config.check_interval
 
     @patch('server.send_magic_packet')
     @patch('server.ping')
@@ -0,0 +1,59 @@
+"""Journal laufender Weckvorgänge
+
+Jeder laufende Weckvorgang wird nach jedem Versuch mit seinem Stand
+(Computer, Chat, bisherige Versuche und Pakete) gesichert. Nach einem
+Neustart oder Absturz setzt der Bot die Vorgänge mit den verbleibenden
+Versuchen fort und meldet das Ergebnis im ursprünglichen Chat.
+
+Die Datei wird immer vollständig in eine temporäre Datei geschrieben und
+per os.replace ausgetauscht, sodass sie nie halb geschrieben ist.
+"""
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class WakeJournal:
+    """Kleines JSON-Journal der laufenden Weckvorgänge"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def load(self):
+        """Liest das Journal; fehlerhafte Dateien werden als leer behandelt"""
+        with self._lock:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    jobs = json.load(f)
+                if not isinstance(jobs, dict):
+                    raise ValueError("Erwartet wird ein Dictionary")
+            except FileNotFoundError:
+                jobs = {}
+            except (OSError, ValueError) as e:
+                logger.error("Journal %s konnte nicht gelesen werden: %s", self.path, e)
+                jobs = {}
+            self._jobs = jobs
+            return dict(jobs)
+
+    def checkpoint(self, job):
+        """Sichert den aktuellen Stand eines Weckvorgangs"""
+        with self._lock:
+            self._jobs[job['id']] = dict(job)
+            self._write()
+
+    def remove(self, job_id):
+        """Entfernt einen abgeschlossenen Weckvorgang"""
+        with self._lock:
+            if self._jobs.pop(job_id, None) is not None:
+                self._write()
+
+    def _write(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._jobs, f, indent=2)
+        os.replace(temp_path, self.path)